@@ -0,0 +1,118 @@
+# ai_modules/anytime_controller.py
+# Deadline-bounded decisions: refine until the frame budget runs out
+
+import time
+
+from .mcts_controller import MCTSController
+
+
+class AnytimeController:
+    """
+    Wraps a planner so every decision finishes within `budget` seconds.
+
+    The planner yields successively better moves (iter_actions(engine)); the
+    wrapper keeps the latest one and stops asking once the next refinement
+    would not fit in the remaining budget. The first answer is always a
+    cheap one, so there is a move even if the deadline hits immediately.
+    Planners without iter_actions are refined in two steps: the greedy
+    pellet step, then the full layered autopilot (or the planner's own
+    choose_action if it is standalone).
+
+    A decision that still overran the budget (a single refinement step took
+    too long) counts as a deadline miss; see stats().
+    """
+
+    # Decides every move itself (no threat / chase layers in the engine)
+    standalone = True
+
+    def __init__(self, planner=None, budget=0.005, clock=time.perf_counter):
+        # planner: e.g. MCTSController (default) or HybridController
+        self.planner = MCTSController() if planner is None else planner
+        self.budget = budget
+        self.clock = clock
+
+        self.decisions = 0
+        self.deadline_misses = 0
+        self.refinements = 0        # refined answers produced, over all decisions
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    # ----------------------------------------------------------
+    def choose_action(self, engine):
+        """
+        Decide Pacman's next move based on the current game engine state.
+        Returns (dx, dy) move tuple.
+        """
+        start = self.clock()
+        deadline = start + self.budget
+
+        # Stop early when the next step would likely overrun: its cost is
+        # estimated by the slowest refinement step of this decision so far
+        action = (0, 0)
+        last = start
+        slowest = 0.0
+        for action in self._refinements(engine):
+            self.refinements += 1
+            now = self.clock()
+            slowest = max(slowest, now - last)
+            last = now
+            if now + slowest >= deadline:
+                break
+
+        elapsed = self.clock() - start
+        self.decisions += 1
+        if elapsed > self.budget:
+            self.deadline_misses += 1
+        self.last_latency = elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+        return action
+
+    def _refinements(self, engine):
+        iter_actions = getattr(self.planner, "iter_actions", None)
+        if iter_actions is not None:
+            return iter_actions(engine)
+        return self._two_step(engine)
+
+    def _two_step(self, engine):
+        moves, _ = engine._greedy_pellet_options()
+        yield moves[0]
+        if getattr(self.planner, "standalone", False):
+            yield self.planner.choose_action(engine)
+        else:
+            yield engine._layered_action(self.planner)
+
+    # ----------------------------------------------------------
+    @property
+    def miss_rate(self):
+        return self.deadline_misses / self.decisions if self.decisions else 0.0
+
+    def stats(self):
+        """Deadline counters since construction (or the last reset_stats())"""
+        return {
+            "budget": self.budget,
+            "decisions": self.decisions,
+            "deadline_misses": self.deadline_misses,
+            "miss_rate": self.miss_rate,
+            "refinements_per_decision": self.refinements / self.decisions if self.decisions else 0.0,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+        }
+
+    def reset(self):
+        """Forward to the planner's reset(), if it has one"""
+        reset_planner = getattr(self.planner, "reset", None)
+        if reset_planner is not None:
+            reset_planner()
+
+    def copy(self):
+        """Same budget and clock around a copy of the planner (if it has copy())"""
+        other = AnytimeController.__new__(AnytimeController)
+        other.__dict__.update(self.__dict__)
+        copy_planner = getattr(self.planner, "copy", None)
+        if copy_planner is not None:
+            other.planner = copy_planner()
+        return other
+
+    def reset_stats(self):
+        self.decisions = self.deadline_misses = self.refinements = 0
+        self.last_latency = self.max_latency = 0.0
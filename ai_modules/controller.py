@@ -1,45 +1,164 @@
 # ai_modules/controller.py
-from .feature_extractor import FeatureExtractor
+from collections import OrderedDict
+
+from .route_planner import PelletRoutePlanner
+
+
+class DecisionCache:
+    """
+    Bounded LRU map from board hash to decision, with hit / miss counters.
+
+    Only valid for decisions that are a pure function of the key: anything
+    else the decision reads (controller state, counters) must be part of
+    the key, or the cache serves stale moves.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached decision or None (counts a hit or a miss)"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
 
 class HybridController:
     """
     Hybrid AI Controller for Pacman:
     Uses features from the game to decide the next move.
+
+    The engine's layered autopilot asks cached_decision() first: boards
+    repeat for several ticks between moves, so most frames are cache hits.
+    A cached decision must be a pure function of decision_key(): the board
+    (engine.zobrist) plus whatever controller state the layers read. A
+    decision whose key changed while it was computed is returned but not
+    stored.
+
+    Pellets are eaten in the order of a PelletRoutePlanner tour (route=False
+    falls back to stepping toward the nearest pellet).
     """
 
-    def __init__(self):
-        self.feature_extractor = FeatureExtractor()
+    def __init__(self, cache_size=4096, route=True):
+        self.cache = DecisionCache(cache_size)
+        self._cache_paths = None
+        self.route = PelletRoutePlanner() if route else None
+
+    def cached_decision(self, engine, compute):
+        """
+        compute() for this board, served from the LRU cache when the board
+        (engine.zobrist) was seen before on the same layout
+        """
+        if engine.paths is not self._cache_paths:
+            # same-size layouts share Zobrist keys; their decisions don't carry over
+            self.cache.clear()
+            self._cache_paths = engine.paths
+        key = self.decision_key(engine)
+        decision = self.cache.get(key)
+        if decision is None:
+            decision = compute()
+            # compute() moved controller state the key covers: not reusable
+            if self.decision_key(engine) == key:
+                self.cache.put(key, decision)
+        return decision
+
+    def decision_key(self, engine):
+        """Everything a layered decision depends on"""
+        if self.route is None:
+            return engine.zobrist
+        # The tour is planner state the board hash doesn't cover
+        return (engine.zobrist, self.route.state_key(engine))
+
+    def reset(self):
+        """New episode on the engine: drop cached decisions and the tour"""
+        self.cache.clear()
+        self._cache_paths = None
+        if self.route is not None:
+            self.route.reset()
+
+    def copy(self):
+        """Same settings and a copy of the tour; the decision cache starts empty"""
+        other = HybridController.__new__(HybridController)
+        other.__dict__.update(self.__dict__)
+        other.cache = DecisionCache(self.cache.maxsize)
+        other._cache_paths = None
+        if self.route is not None:
+            other.route = self.route.copy()
+        return other
+
+    def summarize(self, engine):
+        """Small rule inputs: ghost distance, pellet count, positions"""
+        pac = engine.pacman
+        ghosts = engine.ghosts
+        # Corrected: combine normal and power pellets
+        pellets = engine.pellets | engine.power_pellets
+
+        # Maze distance to the nearest threatening ghost (engine's shared field)
+        min_ghost_dist = engine.threat_field().distance((pac.tx, pac.ty))
+        if min_ghost_dist == float("inf"):
+            min_ghost_dist = 99
+
+        return {
+            "min_ghost_dist": min_ghost_dist,
+            "pellet_count": len(pellets),
+            "ghost_positions": [(g.tx, g.ty) for g in ghosts],
+            "pacman": (pac.tx, pac.ty)
+        }
 
     def choose_action(self, engine):
         """
         Decide Pacman's next move based on the current game engine state.
         Returns (dx, dy) move tuple.
         """
-        features = self.feature_extractor.extract(engine)
+        features = self.summarize(engine)
 
         # Simple rule-based logic (demo)
         pac_x, pac_y = features["pacman"]
         ghost_positions = features["ghost_positions"]
         min_ghost_dist = features["min_ghost_dist"]
-        min_pellet_dist = features["min_pellet_dist"]
         pellets_left = features["pellet_count"]
 
         # Avoid ghosts if too close
         if min_ghost_dist <= 1:
-            # Move away from closest ghost
-            gx, gy = ghost_positions[0]  # closest ghost
-            dx = pac_x - gx
-            dy = pac_y - gy
-            # normalize to one step
-            if abs(dx) > abs(dy):
-                dx = 1 if dx > 0 else -1
-                dy = 0
-            else:
-                dy = 1 if dy > 0 else -1
-                dx = 0
-            return dx, dy
-
-        # Otherwise, move toward nearest pellet (very simple greedy)
+            # Step to the open neighbour the ghosts need longest to reach
+            field = engine.threat_field()
+            moves = engine._open_moves((pac_x, pac_y))
+            if moves:
+                return max(moves, key=lambda m: field.distance(m[1]))[0]
+            return 0, 0
+
+        # Otherwise, follow the pellet tour; a step into danger is left to
+        # the engine's safe greedy fallback (the tour repairs after the detour)
+        if self.route is not None:
+            step = self.route.next_step(engine)
+            if step is None or engine._is_tile_dangerous(pac_x + step[0], pac_y + step[1]):
+                return 0, 0
+            return step
+
+        # Or move toward nearest pellet (very simple greedy)
         # Get all pellets (normal + power)
         pellets = engine.pellets | engine.power_pellets
         if not pellets:
@@ -0,0 +1,216 @@
+# ai_modules/expectimax_controller.py
+import math
+import time
+
+from .forward_model import ForwardModel, DIRECTIONS, NO_DIR, is_decision_tick
+
+
+# Decision nodes searched between clock reads
+CLOCK_CHECK_NODES = 8
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ExpectimaxController:
+    """
+    Depth-limited expectimax over the ForwardModel.
+
+    Pac-Man's moves are max nodes; each is followed by a chance node over
+    the ghosts' moves (uniform over non-reversing options, or the flee
+    picks when vulnerable, exactly as Ghost.choose_move draws them). Only
+    ghosts that can reach Pac-Man within the search horizon are branched
+    on, the rest follow their first option.
+
+    Iterative deepening runs depth 1, 2, ... until `max_depth` or the time
+    limit. A transposition table keyed by the compact model state (minus
+    the score) merges repeated states and carries values and best moves
+    from one depth to the next; it is cleared for every decision, since
+    leaf values depend on that decision's pellet field.
+
+    Moves are ordered best-move-first, then downhill on the pellet distance
+    field (the greedy heuristic). When the clock runs out mid-depth, the
+    deepest fully searched answer is used. last_depth / nodes_per_sec
+    (see stats()) help pick max_depth and time_limit per level.
+    """
+
+    # Decides every move itself (no threat / chase layers in the engine)
+    standalone = True
+
+    def __init__(self, max_depth=6, time_limit=0.010, discount=0.95,
+                 death_penalty=500.0, win_bonus=500.0):
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.discount = discount
+        self.death_penalty = death_penalty
+        self.win_bonus = win_bonus
+
+        self._model = None
+        self._model_paths = None
+        self._table = {}
+
+        # stats of the most recent search, plus running totals
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.last_latency = 0.0
+        self.total_nodes = 0
+        self.total_time = 0.0
+
+    def reset(self):
+        """Drop the transposition table (new episode / restored engine)"""
+        self._table = {}
+
+    def copy(self):
+        """Same settings and forward model, empty transposition table"""
+        other = ExpectimaxController.__new__(ExpectimaxController)
+        other.__dict__.update(self.__dict__)
+        other.reset()
+        return other
+
+    # ----------------------------------------------------------
+    def choose_action(self, engine):
+        """
+        Decide Pacman's next move based on the current game engine state.
+        Returns (dx, dy) move tuple.
+        """
+        # Only the move set on the tick Pac-Man moves is taken (see
+        # MCTSController.choose_action); in between he keeps his heading
+        if not is_decision_tick(engine):
+            return engine.pacman.direction
+        if self._model is None or self._model_paths is not engine.paths:
+            self._model = ForwardModel(engine)
+            self._model_paths = engine.paths
+
+        model = self._model
+        root = model.root_state(engine)
+        if root is None:
+            return (0, 0)
+
+        # ghosts and Pac-Man close in by up to ~2 tiles per ply
+        pac = (engine.pacman.tx, engine.pacman.ty)
+        horizon = 2 * self.max_depth + 2
+        branching = set()
+        for i, g in enumerate(engine.ghosts):
+            d = engine.paths.distance(pac, (g.tx, g.ty))
+            if d is not None and d <= horizon:
+                branching.add(i)
+        action = self.search(root, model.pellet_dist(engine), model.root_wait(engine), branching)
+        return DIRECTIONS[action] if action != NO_DIR else (0, 0)
+
+    def search(self, root_state, pellet_dist, root_wait=None, branching=None):
+        """Iterative-deepening expectimax from a model state; returns an action index"""
+        model = self._model
+        legal = model.legal_actions(root_state)
+        if not legal or model.is_win(root_state):
+            self.last_depth = self.last_nodes = 0
+            return NO_DIR
+        if len(legal) == 1:
+            self.last_depth = self.last_nodes = 0
+            return legal[0][0]
+
+        self._table = {}
+        self._pellet_dist = pellet_dist
+        self._branching = branching
+        self._nodes = 0
+        self._until_check = CLOCK_CHECK_NODES
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit
+
+        # depth 0 answer: the greedy heuristic alone
+        best = min(legal, key=lambda m: pellet_dist[m[1]])[0]
+        depth = 0
+        try:
+            for d in range(1, self.max_depth + 1):
+                best = self._root(root_state, d, root_wait)
+                depth = d
+        except _Timeout:
+            pass
+
+        self.last_depth = depth
+        self.last_nodes = self._nodes
+        self.last_latency = time.perf_counter() - start
+        self.total_nodes += self._nodes
+        self.total_time += self.last_latency
+        return best
+
+    @property
+    def nodes_per_sec(self):
+        """Search speed over all decisions so far"""
+        return self.total_nodes / self.total_time if self.total_time else 0.0
+
+    def stats(self):
+        return {
+            "last_depth": self.last_depth,
+            "last_nodes": self.last_nodes,
+            "last_latency": self.last_latency,
+            "nodes_per_sec": self.nodes_per_sec,
+            "table_entries": len(self._table),
+        }
+
+    # ----------------------------------------------------------
+    def _ordered(self, state, best):
+        """Legal moves, previous best first, then downhill on the pellet field"""
+        dist = self._pellet_dist
+        moves = sorted(self._model.legal_actions(state), key=lambda m: dist[m[1]])
+        if best != NO_DIR:
+            moves.sort(key=lambda m: m[0] != best)
+        return moves
+
+    def _root(self, state, depth, root_wait):
+        entry = self._table.get(state[:4])
+        hint = entry[2] if entry else NO_DIR
+        best, best_value = NO_DIR, -math.inf
+        for action, _ in self._ordered(state, hint):
+            value = self._chance(state, action, depth, root_wait)
+            if value > best_value:
+                best, best_value = action, value
+        self._table[state[:4]] = (depth, best_value, best)
+        return best
+
+    def _max(self, state, depth):
+        """Value of a Pac-Man decision node"""
+        model = self._model
+        if model.is_win(state):
+            return self.win_bonus
+        if depth == 0:
+            return self._evaluate(state)
+
+        key = state[:4]
+        entry = self._table.get(key)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+
+        self._nodes += 1
+        self._until_check -= 1
+        if not self._until_check:
+            self._until_check = CLOCK_CHECK_NODES
+            if time.perf_counter() >= self._deadline:
+                raise _Timeout
+
+        hint = entry[2] if entry else NO_DIR
+        best, best_value = NO_DIR, -math.inf
+        for action, _ in self._ordered(state, hint):
+            value = self._chance(state, action, depth)
+            if value > best_value:
+                best, best_value = action, value
+        if best == NO_DIR:
+            best_value = self._evaluate(state)
+        self._table[key] = (depth, best_value, best)
+        return best_value
+
+    def _chance(self, state, action, depth, elapsed=None):
+        """Expected value of taking `action`: averaged over the ghosts' moves"""
+        self._nodes += 1
+        value = 0.0
+        for p, nxt, reward, dead in self._model.outcomes(state, action, elapsed, self._branching):
+            if dead:
+                value += p * (reward - self.death_penalty)
+            else:
+                value += p * (reward + self.discount * self._max(nxt, depth - 1))
+        return value
+
+    def _evaluate(self, state):
+        """Leaf value: pull toward the nearest pellet (distance field of the root)"""
+        d = self._pellet_dist[state[0]]
+        return -d if d != math.inf else 0.0
@@ -1,33 +1,228 @@
+# ai_modules/feature_extractor.py
+import weakref
+
 import numpy as np
-from utils.math_utils import manhattan
+
+from .forward_model import DIRECTIONS, VULNERABLE_TIME
+
+INF = float("inf")
+
+# Fixed feature layout: a global block, then one block per direction in
+# DIRECTIONS order (right, left, down, up). Distances are maze (BFS)
+# distances divided by width + height and clipped to 1; 1.0 also means
+# "none left" / "unreachable".
+GLOBAL_FEATURES = (
+    "bias",
+    "pellets_left",      # remaining pellets / walkable tiles
+    "power_left",        # remaining power pellets / walkable tiles
+    "pellet_dist",       # nearest pellet (normal or power)
+    "power_dist",        # nearest power pellet
+    "ghost_dist",        # nearest normal ghost
+    "vulnerable_dist",   # nearest vulnerable ghost
+    "vulnerable_time",   # longest remaining vulnerable timer / VULNERABLE_TIME
+)
+DIRECTION_FEATURES = (
+    "legal",             # 1 if the move isn't into a wall
+    "pellet_here",       # 1 if the neighbour tile holds a pellet
+    "pellet_dist",       # the global distances, measured from the neighbour tile
+    "ghost_dist",
+    "vulnerable_dist",
+)
+DIRECTION_NAMES = ("right", "left", "down", "up")
+
+FEATURE_NAMES = list(GLOBAL_FEATURES) + [
+    f"{d}_{f}" for d in DIRECTION_NAMES for f in DIRECTION_FEATURES
+]
+NUM_FEATURES = len(FEATURE_NAMES)
+DIRECTION_OFFSET = len(GLOBAL_FEATURES)
+DIRECTION_STRIDE = len(DIRECTION_FEATURES)
+
 
 class FeatureExtractor:
     """
-    Converts game state into a vector of useful features.
-    Used by controller for decision making.
+    Converts game state into a fixed-layout float32 feature vector
+    (see FEATURE_NAMES), e.g. as input to a learned policy.
+
+    extract() is the single-engine path: plain lookups into per-layout
+    lists (neighbours, PathTable rows), no array setup per call.
+    extract_batch() computes many engines at once: the per-engine work is
+    gathering a few node indices, and all distance lookups run as array
+    ops on the layout's PathTable. Both produce the same values.
     """
 
+    def __init__(self):
+        # PathTable -> neighbour table; dropped with the table
+        self._moves = weakref.WeakKeyDictionary()
+        # PathTable -> per-layout lists for extract() (see _layout_lists)
+        self._lists = weakref.WeakKeyDictionary()
+
     def extract(self, engine):
-        pac = engine.pacman
-        ghosts = engine.ghosts
-        # Corrected: combine normal and power pellets
-        pellets = engine.pellets | engine.power_pellets
-
-        # Distances to all ghosts
-        ghost_dists = [manhattan((pac.tx, pac.ty), (g.tx, g.ty)) for g in ghosts]
-        min_ghost_dist = min(ghost_dists) if ghost_dists else 99
-
-        # Distances to pellets
-        pellet_dists = [manhattan((pac.tx, pac.ty), p) for p in pellets]
-        min_pellet_dist = min(pellet_dists) if pellet_dists else 0
-
-        # Count pellets left
-        pellet_count = len(pellets)
-
-        return {
-            "min_ghost_dist": min_ghost_dist,
-            "min_pellet_dist": min_pellet_dist,
-            "pellet_count": pellet_count,
-            "ghost_positions": [(g.tx, g.ty) for g in ghosts],
-            "pacman": (pac.tx, pac.ty)
-        }
+        """(NUM_FEATURES,) float32 array for one engine"""
+        paths = engine.paths
+        lists = self._lists.get(paths) or self._layout_lists(paths)
+        steps, flat, rows, n = lists
+        index = paths.index
+        scale = float(paths.width + paths.height)
+
+        pac = index[(engine.pacman.tx, engine.pacman.ty)]
+        normal, vulnerable = [], []
+        vuln_time = 0.0
+        for g in engine.ghosts:
+            node = index.get((g.tx, g.ty))
+            if node is None:
+                continue
+            if g.state == "normal":
+                normal.append(rows[node])
+            else:
+                vulnerable.append(rows[node])
+                vuln_time = max(vuln_time, g.vulnerable_timer)
+
+        # The table is symmetric: ghost rows give every tile's distance to them
+        pellets, power = engine.pellets, engine.power_pellets
+        field = engine.pellet_field.dist      # tile-indexed
+        here = rows[pac]
+        out = [
+            1.0,
+            (len(pellets) + len(power)) / n,
+            len(power) / n,
+            field[flat[pac]] / scale,
+            min([here[index[pos]] for pos in power], default=INF) / scale,
+            min([r[pac] for r in normal], default=INF) / scale,
+            min([r[pac] for r in vulnerable], default=INF) / scale,
+            vuln_time / VULNERABLE_TIME,
+        ]
+        for v, tile in steps[pac]:
+            if v < 0:
+                # walls: nothing is reachable through them
+                out += (0.0, 0.0, 1.0, 1.0, 1.0)
+                continue
+            out += (
+                1.0,
+                1.0 if tile in pellets or tile in power else 0.0,
+                field[flat[v]] / scale,
+                min([r[v] for r in normal], default=INF) / scale,
+                min([r[v] for r in vulnerable], default=INF) / scale,
+            )
+        # distances (and the timer) clip to 1
+        features = np.array(out, dtype=np.float32)
+        return np.minimum(features, 1.0, out=features)
+
+    def extract_batch(self, engines):
+        """(len(engines), NUM_FEATURES) float32 array"""
+        out = np.empty((len(engines), NUM_FEATURES), dtype=np.float32)
+        # engines on the same layout share a PathTable
+        groups = {}
+        for row, engine in enumerate(engines):
+            groups.setdefault(id(engine.paths), []).append(row)
+        for rows in groups.values():
+            out[rows] = self._extract_group([engines[r] for r in rows])
+        return out
+
+    # ----------------------------------------------------------
+    def _neighbour_table(self, paths):
+        """(n, 4) neighbour node per direction, -1 for walls"""
+        moves = self._moves.get(paths)
+        if moves is None:
+            moves = np.full((len(paths.nodes), 4), -1, dtype=np.int64)
+            for i, (x, y) in enumerate(paths.nodes):
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    moves[i, d] = paths.index.get((x + dx, y + dy), -1)
+            self._moves[paths] = moves
+        return moves
+
+    def _layout_lists(self, paths):
+        """(node -> ((neighbour, tile), ...) per direction, node -> maze flat index, dist rows, n)"""
+        lists = self._lists.get(paths)
+        if lists is None:
+            steps = [
+                tuple((v, paths.nodes[v] if v >= 0 else None) for v in nbrs)
+                for nbrs in self._neighbour_table(paths).tolist()
+            ]
+            lists = (steps, paths.flat.tolist(), paths.dist.tolist(), len(paths.nodes))
+            self._lists[paths] = lists
+        return lists
+
+    def _extract_group(self, engines):
+        paths = engines[0].paths
+        index = paths.index
+        flat = paths.flat
+        moves = self._neighbour_table(paths)
+        b = len(engines)
+        n = len(paths.nodes)
+        scale = float(paths.width + paths.height)
+
+        num_ghosts = max(1, max(len(e.ghosts) for e in engines))
+        num_power = max(1, max(len(e.power_pellets) for e in engines))
+
+        pac = np.empty(b, dtype=np.int64)
+        field = np.empty((b, 5), dtype=np.float64)        # pellet distance at pac + neighbours
+        food = np.zeros((b, 4), dtype=bool)               # pellet on neighbour tile
+        counts = np.empty((b, 2), dtype=np.float64)       # pellets, power pellets
+        ghost_nodes = np.zeros((b, num_ghosts), dtype=np.int64)
+        normal = np.zeros((b, num_ghosts), dtype=bool)
+        vulnerable = np.zeros((b, num_ghosts), dtype=bool)
+        vuln_time = np.zeros(b, dtype=np.float64)
+        power_nodes = np.zeros((b, num_power), dtype=np.int64)
+        has_power = np.zeros((b, num_power), dtype=bool)
+
+        # Gather: a handful of lookups per engine
+        for r, e in enumerate(engines):
+            p = index[(e.pacman.tx, e.pacman.ty)]
+            pac[r] = p
+            dist = e.pellet_field.dist      # tile-indexed
+            nbrs = moves[p].tolist()
+            field[r] = [dist[flat[p]]] + [dist[flat[v]] if v >= 0 else np.inf for v in nbrs]
+            for d, v in enumerate(nbrs):
+                if v >= 0:
+                    tile = paths.nodes[v]
+                    food[r, d] = tile in e.pellets or tile in e.power_pellets
+            counts[r] = len(e.pellets), len(e.power_pellets)
+
+            for k, g in enumerate(e.ghosts):
+                node = index.get((g.tx, g.ty))
+                if node is None:
+                    continue
+                ghost_nodes[r, k] = node
+                if g.state == "normal":
+                    normal[r, k] = True
+                else:
+                    vulnerable[r, k] = True
+                    vuln_time[r] = max(vuln_time[r], g.vulnerable_timer)
+            for k, pos in enumerate(e.power_pellets):
+                power_nodes[r, k] = index[pos]
+                has_power[r, k] = True
+
+        # Vectorized distance lookups
+        nbrs = moves[pac]                                     # (b, 4)
+        legal = nbrs >= 0
+        sources = np.concatenate([pac[:, None], np.where(legal, nbrs, pac[:, None])], axis=1)
+
+        table = paths.dist
+        ghost_d = table[sources[:, :, None], ghost_nodes[:, None, :]].astype(np.float64)  # (b, 5, G)
+        normal_d = np.where(normal[:, None, :], ghost_d, np.inf).min(axis=2)
+        vuln_d = np.where(vulnerable[:, None, :], ghost_d, np.inf).min(axis=2)
+        power_d = np.where(has_power, table[pac[:, None], power_nodes], np.inf).min(axis=1)
+
+        def norm(d):
+            return np.minimum(d / scale, 1.0)
+
+        out = np.empty((b, NUM_FEATURES), dtype=np.float32)
+        out[:, 0] = 1.0
+        out[:, 1] = (counts[:, 0] + counts[:, 1]) / n
+        out[:, 2] = counts[:, 1] / n
+        out[:, 3] = norm(field[:, 0])
+        out[:, 4] = norm(power_d)
+        out[:, 5] = norm(normal_d[:, 0])
+        out[:, 6] = norm(vuln_d[:, 0])
+        out[:, 7] = np.minimum(vuln_time / VULNERABLE_TIME, 1.0)
+
+        blocks = np.empty((b, 4, DIRECTION_STRIDE), dtype=np.float32)
+        blocks[:, :, 0] = legal
+        blocks[:, :, 1] = food
+        blocks[:, :, 2] = norm(field[:, 1:])
+        blocks[:, :, 3] = norm(normal_d[:, 1:])
+        blocks[:, :, 4] = norm(vuln_d[:, 1:])
+        # walls: nothing is reachable through them
+        blocks[:, :, 2:][~legal] = 1.0
+        out[:, DIRECTION_OFFSET:] = blocks.reshape(b, -1)
+        return out
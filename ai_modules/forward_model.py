@@ -0,0 +1,307 @@
+# ai_modules/forward_model.py
+# Lightweight forward model of the game for search-based controllers
+
+import itertools
+import math
+
+
+# Action indices match the engine's direction scan order (= maze MOVE_DIRS)
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+REVERSE = (1, 0, 3, 2)
+NO_DIR = -1
+# Maze.turn_moves slot of "no move yet" (environment.maze.NO_HEADING)
+NO_HEADING = 4
+
+PELLET_SCORE = 10
+POWER_SCORE = 25
+GHOST_SCORE = 50
+
+VULNERABLE_TIME = 5.0
+
+
+def is_decision_tick(engine):
+    """True when Pac-Man moves on the next tick, so the move set now is the one taken"""
+    pac = engine.pacman
+    return pac.time_since_move + engine.fixed_dt >= pac.move_delay
+
+
+class ForwardModel:
+    """
+    Abstract simulator that advances the game one Pac-Man move at a time.
+
+    State is a flat tuple so it can be copied and hashed cheaply:
+        (pac, pellets, power, ghosts, score)
+    pac            : node index (PathTable numbering)
+    pellets, power : int bitmasks over node indices
+    ghosts         : tuple of (node, last_dir, progress, vulnerable_ticks)
+
+    One step covers the ticks up to and including Pac-Man's next move.
+    Timings come from the engine's move delays expressed in fixed ticks, so
+    ghosts move ~5/6 as often as Pac-Man, and much less when vulnerable.
+    """
+
+    def __init__(self, engine):
+        paths = engine.paths
+        self.index = paths.index
+        self.coords = paths.nodes
+        n = len(paths.nodes)
+
+        # moves[node] = ((dir, neighbour), ...) in DIRECTIONS order
+        self.moves = []
+        for x, y in paths.nodes:
+            self.moves.append(tuple(
+                (d, self.index[(x + dx, y + dy)])
+                for d, (dx, dy) in enumerate(DIRECTIONS)
+                if (x + dx, y + dy) in self.index
+            ))
+
+        # Ghost choices exclude the 180° reversal unless it's the only exit:
+        # the maze's per-heading move table, the one Ghost.choose_move reads
+        maze = engine.maze
+        self.ghost_moves = {}
+        for node, (x, y) in enumerate(paths.nodes):
+            here = (y * maze.width + x) * 5
+            for last in (NO_DIR, 0, 1, 2, 3):
+                turns = maze.turn_moves[here + (NO_HEADING if last == NO_DIR else last)]
+                self.ghost_moves[(node, last)] = tuple(
+                    (DIRECTIONS.index(d), self.index[(x + d[0], y + d[1])]) for d in turns
+                )
+
+        dt = engine.fixed_dt
+        pac, ghost = engine.pacman, (engine.ghosts[0] if engine.ghosts else None)
+        self.pac_ticks = self._ticks(pac.normal_move_delay, dt)
+        self.pac_boost_ticks = self._ticks(pac.boost_move_delay, dt)
+        if ghost is not None:
+            self.ghost_ticks = self._ticks(ghost.normal_move_delay, dt)
+            self.ghost_vuln_ticks = self._ticks(ghost.vulnerable_move_delay, dt)
+        else:
+            self.ghost_ticks = self.ghost_vuln_ticks = 1
+        self.vulnerable_ticks = int(round(VULNERABLE_TIME / dt))
+
+        # Eaten ghosts go back to (1, 1), as in GameEngine
+        self.respawn = self.index.get((1, 1))
+
+        # Vulnerable ghosts flee by maze distance (PathTable rows, as lists on demand)
+        self._dist = paths.dist
+        self._flee_rows = {}
+
+        # maze flat index of every node, to read the engine's tile-indexed fields
+        self.flat = paths.flat.tolist()
+
+    @staticmethod
+    def _ticks(delay, dt):
+        return max(1, math.ceil(delay / dt - 1e-9))
+
+    # ----------------------------------------------------------
+    def root_state(self, engine):
+        """Translate the live engine into a model state (None if Pac-Man is off the maze graph)"""
+        pac = self.index.get((engine.pacman.tx, engine.pacman.ty))
+        if pac is None:
+            return None
+
+        pellets = 0
+        for pos in engine.pellets:
+            pellets |= 1 << self.index[pos]
+        power = 0
+        for pos in engine.power_pellets:
+            power |= 1 << self.index[pos]
+
+        dt = engine.fixed_dt
+        ghosts = []
+        for g in engine.ghosts:
+            node = self.index.get((g.tx, g.ty))
+            if node is None:
+                continue
+            last = (g._last_dx, g._last_dy)
+            last_dir = DIRECTIONS.index(last) if last in DIRECTIONS else NO_DIR
+            vuln = int(g.vulnerable_timer / dt) if g.state == "vulnerable" else 0
+            progress = g.time_since_move / g.move_delay if g.move_delay else 0.0
+            ghosts.append((node, last_dir, progress, vuln))
+
+        return (pac, pellets, power, tuple(ghosts), engine.pacman.score)
+
+    def pellet_dist(self, engine):
+        """The engine's nearest-pellet distances, per node"""
+        dist = engine.pellet_field.dist
+        return [dist[i] for i in self.flat]
+
+    def root_wait(self, engine):
+        """Ticks until Pac-Man's next move actually happens (>= 1)"""
+        pac = engine.pacman
+        waited = int(pac.time_since_move / engine.fixed_dt + 1e-9)
+        return max(1, self._ticks(pac.move_delay, engine.fixed_dt) - waited)
+
+    def legal_actions(self, state):
+        return self.moves[state[0]]
+
+    def is_win(self, state):
+        return not state[1] and not state[2]
+
+    # ----------------------------------------------------------
+    def step(self, state, action, rng, elapsed=None):
+        """
+        Advance until Pac-Man's next move: ghosts act during the `elapsed`
+        ticks leading up to it (default: one full move delay; pass
+        root_wait() for the first step out of a live engine), then Pac-Man
+        takes `action` (dir index).
+        Returns (next_state, reward, dead).
+        """
+        pac, ghosts = state[0], state[3]
+        elapsed = self._elapsed(ghosts, elapsed)
+
+        # Ghosts move during the wait
+        moved = []
+        for node, last, progress, vuln in ghosts:
+            vuln = max(0, vuln - elapsed)
+            progress += elapsed / (self.ghost_vuln_ticks if vuln else self.ghost_ticks)
+            while progress >= 1.0:
+                progress -= 1.0
+                options = self.ghost_moves[(node, last)]
+                if not options:
+                    break
+                if vuln:
+                    options = self._flee_moves(options, pac)
+                last, node = options[0] if len(options) == 1 else rng.choice(options)
+                if node == pac:
+                    break
+            moved.append((node, last, progress, vuln))
+
+        return self._resolve(state, moved, action)
+
+    def outcomes(self, state, action, elapsed=None, branching=None):
+        """
+        Every way a step can turn out, for expectimax: a list of
+        (probability, next_state, reward, dead) whose probabilities sum to 1.
+        branching: indices of the ghosts whose random choices are enumerated;
+        the others (e.g. too far away to matter) always take their first
+        option. Default: all ghosts.
+        """
+        ghosts = state[3]
+        elapsed = self._elapsed(ghosts, elapsed)
+        pac = state[0]
+
+        per_ghost = [
+            self._ghost_outcomes(g, elapsed, pac, branching is None or i in branching)
+            for i, g in enumerate(ghosts)
+        ]
+        result = []
+        for combo in itertools.product(*per_ghost):
+            p = 1.0
+            for q, _ in combo:
+                p *= q
+            result.append((p,) + self._resolve(state, [g for _, g in combo], action))
+        return result
+
+    # ----------------------------------------------------------
+    def _elapsed(self, ghosts, elapsed):
+        """Ticks until Pac-Man's next move (default: one full, maybe boosted, delay)"""
+        if elapsed is not None:
+            return elapsed
+        boosted = any(g[3] > 0 for g in ghosts)
+        return self.pac_boost_ticks if boosted else self.pac_ticks
+
+    def _flee_moves(self, options, pac):
+        """Vulnerable ghosts' picks: the options maximising maze distance to Pac-Man"""
+        row = self._flee_rows.get(pac)
+        if row is None:
+            row = self._flee_rows[pac] = self._dist[pac].tolist()
+        best, picks = -1, []
+        for d, nbr in options:
+            dist = row[nbr]
+            if dist > best:
+                best, picks = dist, [(d, nbr)]
+            elif dist == best:
+                picks.append((d, nbr))
+        return picks
+
+    def _ghost_outcomes(self, ghost, elapsed, pac, branch=True):
+        """[(probability, ghost)] after `elapsed` ticks; step() samples one of these"""
+        node, last, progress, vuln = ghost
+        vuln = max(0, vuln - elapsed)
+        progress += elapsed / (self.ghost_vuln_ticks if vuln else self.ghost_ticks)
+        out = []
+
+        def walk(node, last, progress, p):
+            if progress < 1.0:
+                out.append((p, (node, last, progress, vuln)))
+                return
+            progress -= 1.0
+            options = self.ghost_moves[(node, last)]
+            if not options:
+                out.append((p, (node, last, progress, vuln)))
+                return
+            if vuln:
+                options = self._flee_moves(options, pac)
+            if not branch:
+                options = options[:1]
+            q = p / len(options)
+            for d, nbr in options:
+                if nbr == pac:
+                    out.append((q, (nbr, d, progress, vuln)))
+                else:
+                    walk(nbr, d, progress, q)
+
+        walk(node, last, progress, 1.0)
+        return out
+
+    def _resolve(self, state, moved, action):
+        """Pac-Man's move, pellets and collisions once the ghosts have `moved`"""
+        pac, pellets, power, _, score = state
+        reward = 0
+        dead = False
+
+        # Pac-Man move (illegal action = stand still, like hitting a wall)
+        old_pac = pac
+        for d, nbr in self.moves[pac]:
+            if d == action:
+                pac = nbr
+                break
+
+        bit = 1 << pac
+        if pellets & bit:
+            pellets &= ~bit
+            reward += PELLET_SCORE
+        scared = False
+        if power & bit:
+            power &= ~bit
+            reward += POWER_SCORE
+            scared = True
+
+        new_ghosts = []
+        for node, last, progress, vuln in moved:
+            # caught during the wait, or Pac-Man walked into the ghost
+            if node == old_pac or node == pac:
+                if vuln:
+                    reward += GHOST_SCORE
+                    node = self.respawn if self.respawn is not None else node
+                    last, progress, vuln = NO_DIR, 0.0, 0
+                else:
+                    dead = True
+            if scared:
+                vuln = self.vulnerable_ticks
+            new_ghosts.append((node, last, progress, vuln))
+
+        return (pac, pellets, power, tuple(new_ghosts), score + reward), reward, dead
+
+    # ----------------------------------------------------------
+    def rollout_action(self, state, last_dir, rng, pellet_dist=None, greedy=0.75):
+        """
+        Cheap rollout move: eat an adjacent pellet if possible, otherwise
+        usually follow `pellet_dist` (a per-node distance field) downhill,
+        never reversing unless forced.
+        """
+        pac, pellets, power = state[0], state[1], state[2]
+        food = pellets | power
+        options = self.ghost_moves[(pac, last_dir)]
+        if not options:
+            return NO_DIR
+        if len(options) == 1:
+            return options[0][0]
+
+        eat = [d for d, nbr in options if food >> nbr & 1]
+        if eat:
+            return eat[0] if len(eat) == 1 else rng.choice(eat)
+
+        if pellet_dist is not None and rng.random() < greedy:
+            return min(options, key=lambda m: pellet_dist[m[1]])[0]
+        return rng.choice(options)[0]
@@ -0,0 +1,254 @@
+# ai_modules/mcts_controller.py
+import math
+import time
+
+from utils.rng import SplitMixRandom
+from .forward_model import ForwardModel, DIRECTIONS, NO_DIR, is_decision_tick
+
+
+class _Node:
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children = {}   # action -> _Node
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSController:
+    """
+    Monte Carlo Tree Search controller for Pacman.
+
+    Open-loop UCT over Pac-Man's moves: every iteration replays the chosen
+    action sequence through the ForwardModel with fresh ghost randomness, so
+    the tree averages over ghost behaviour. Each decision is bounded both by
+    a rollout budget and by a wall-clock time limit, so it can run inside the
+    30 FPS loop; time_limit=None drops the clock and runs exactly `rollouts`
+    iterations, so decisions are reproducible.
+
+    Ghost randomness comes from `seed` when one is given, else from the
+    engine's ai_rng, so a seeded engine replays the same searches (also
+    from a restored snapshot, which carries ai_rng).
+    """
+
+    # Decides every move itself (no threat / chase layers in the engine)
+    standalone = True
+
+    def __init__(self, rollouts=300, time_limit=0.010, rollout_depth=16,
+                 exploration=10.0, progressive_bias=20.0, discount=0.95,
+                 death_penalty=500.0, win_bonus=500.0, seed=None):
+        self.rollouts = rollouts
+        self.time_limit = time_limit
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.progressive_bias = progressive_bias
+        self.discount = discount
+        self.death_penalty = death_penalty
+        self.win_bonus = win_bonus
+        self.rng = None if seed is None else SplitMixRandom(seed)
+        # stream the current search draws from (see _ensure_model)
+        self._rng = self.rng if self.rng is not None else SplitMixRandom()
+
+        self._model = None
+        self._model_paths = None
+
+        # iter_actions(): tree kept across calls while the board is unchanged
+        self._tree = None
+        self._tree_key = None
+
+        # stats of the most recent search
+        self.last_rollouts = 0
+        self.last_latency = 0.0
+
+    def reset(self):
+        """Drop the anytime search tree (new episode / restored engine)"""
+        self._tree = None
+        self._tree_key = None
+
+    def copy(self):
+        """Same settings and forward model, no search tree (a `seed` stream is copied)"""
+        other = MCTSController.__new__(MCTSController)
+        other.__dict__.update(self.__dict__)
+        if self.rng is not None:
+            other.rng = other._rng = self.rng.copy()
+        other.reset()
+        return other
+
+    # ----------------------------------------------------------
+    def choose_action(self, engine):
+        """
+        Decide Pacman's next move based on the current game engine state.
+        Returns (dx, dy) move tuple.
+        """
+        # Only the move set on the tick Pac-Man moves is taken; in between
+        # he keeps his heading. Searching only then (not whenever the board
+        # changes) leaves no decision cached across ticks, so a restored
+        # snapshot replays the same moves.
+        if not is_decision_tick(engine):
+            return engine.pacman.direction
+        self._ensure_model(engine)
+
+        root = self._model.root_state(engine)
+        if root is None:
+            return (0, 0)
+        action = self.search(root, self._model.pellet_dist(engine), self._model.root_wait(engine))
+        return DIRECTIONS[action] if action != NO_DIR else (0, 0)
+
+    def iter_actions(self, engine):
+        """
+        Anytime search: yields the best move found so far, first the
+        downhill move on the pellet distance field, then one refinement per
+        rollout, up to `rollouts` (time_limit is left to the caller, e.g.
+        AnytimeController). The tree survives while the board is unchanged,
+        so a search cut short by a deadline resumes on the next call.
+        """
+        self._ensure_model(engine)
+        model = self._model
+
+        key = self._board_key(engine)
+        if key != self._tree_key:
+            self._tree = (model.root_state(engine), model.pellet_dist(engine),
+                          model.root_wait(engine), _Node())
+            self._tree_key = key
+        root_state, pellet_dist, root_wait, root = self._tree
+
+        legal = model.legal_actions(root_state) if root_state is not None else ()
+        if not legal or model.is_win(root_state):
+            yield (0, 0)
+            return
+        if len(legal) == 1 or not root.children:
+            yield DIRECTIONS[min(legal, key=lambda m: pellet_dist[m[1]])[0]]
+            if len(legal) == 1:
+                return
+        else:
+            yield DIRECTIONS[self._most_visited(root)]
+
+        self.last_rollouts = 0
+        while root.visits < self.rollouts:
+            self._iterate(root, root_state, pellet_dist, root_wait)
+            self.last_rollouts += 1
+            yield DIRECTIONS[self._most_visited(root)]
+
+    def search(self, root_state, pellet_dist, root_wait=None):
+        """
+        Run MCTS from a model state; returns the best action index.
+        root_wait: ticks until Pac-Man's first move (see ForwardModel.root_wait)
+        """
+        model = self._model
+        legal = model.legal_actions(root_state)
+        if not legal or model.is_win(root_state):
+            self.last_rollouts = 0
+            return NO_DIR
+        if len(legal) == 1:
+            self.last_rollouts = 0
+            return legal[0][0]
+
+        root = _Node()
+        start = time.perf_counter()
+        deadline = math.inf if self.time_limit is None else start + self.time_limit
+
+        iterations = 0
+        while iterations < self.rollouts:
+            self._iterate(root, root_state, pellet_dist, root_wait)
+            iterations += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.last_rollouts = iterations
+        self.last_latency = time.perf_counter() - start
+
+        return self._most_visited(root)
+
+    # ----------------------------------------------------------
+    def _ensure_model(self, engine):
+        self._rng = engine.ai_rng if self.rng is None else self.rng
+        if self._model is None or self._model_paths is not engine.paths:
+            self._model = ForwardModel(engine)
+            self._model_paths = engine.paths
+            self._tree_key = None
+
+    @staticmethod
+    def _board_key(engine):
+        return (
+            engine.pacman.tx, engine.pacman.ty,
+            tuple((g.tx, g.ty, g.state) for g in engine.ghosts),
+            len(engine.pellets) + len(engine.power_pellets),
+        )
+
+    @staticmethod
+    def _most_visited(root):
+        """Most visited root action is the robust choice"""
+        return max(root.children.items(), key=lambda kv: kv[1].visits)[0]
+
+    def _iterate(self, root, state, pellet_dist, root_wait):
+        model, rng = self._model, self._rng
+        node = root
+        path = [root]
+        rewards = []
+        dead = False
+        last_dir = NO_DIR
+
+        # Selection / expansion (Pac-Man's position is deterministic per path)
+        while not dead and not model.is_win(state):
+            legal = model.legal_actions(state)
+            untried = [d for d, _ in legal if d not in node.children]
+            if untried:
+                action = untried[0] if len(untried) == 1 else rng.choice(untried)
+                node.children[action] = child = _Node()
+            else:
+                action, child = self._select(node, state[0], legal, pellet_dist)
+            elapsed = root_wait if node is root else None
+            state, reward, dead = model.step(state, action, rng, elapsed)
+            rewards.append(reward)
+            last_dir = action
+            node = child
+            path.append(node)
+            if untried:
+                break
+
+        # Rollout
+        value = 0.0
+        scale = 1.0
+        depth = 0
+        while not dead and not model.is_win(state) and depth < self.rollout_depth:
+            action = model.rollout_action(state, last_dir, rng, pellet_dist)
+            state, reward, dead = model.step(state, action, rng)
+            value += scale * reward
+            scale *= self.discount
+            last_dir = action
+            depth += 1
+
+        if dead:
+            value -= scale * self.death_penalty
+        elif model.is_win(state):
+            value += scale * self.win_bonus
+        else:
+            # pellets beyond the horizon: pull toward the nearest one
+            d = pellet_dist[state[0]]
+            value -= scale * (d if d != math.inf else 0)
+
+        # Backpropagation: each child scores the discounted return of the
+        # move that leads into it
+        for i in range(len(path) - 1, 0, -1):
+            value = rewards[i - 1] + self.discount * value
+            path[i].visits += 1
+            path[i].value += value
+        root.visits += 1
+
+    def _select(self, node, pac, legal, pellet_dist):
+        """
+        UCB1 plus a progressive-bias term that favours moves going downhill
+        on the pellet distance field; it fades as a child gets visits.
+        """
+        log_n = math.log(node.visits)
+        c, bias = self.exploration, self.progressive_bias
+        here = pellet_dist[pac]
+        best, best_score = None, -math.inf
+        for action, nbr in legal:
+            child = node.children[action]
+            score = child.value / child.visits + c * math.sqrt(log_n / child.visits)
+            if here != math.inf:
+                score += bias * (here - pellet_dist[nbr]) / (child.visits + 1)
+            if score > best_score:
+                best, best_score = (action, child), score
+        return best
@@ -0,0 +1,182 @@
+# ai_modules/q_learning.py
+# Approximate (linear) Q-learning over FeatureExtractor vectors
+
+import os
+
+import numpy as np
+
+from utils.rng import SplitMixRandom
+from .feature_extractor import (FeatureExtractor, FEATURE_NAMES,
+                                DIRECTION_OFFSET, DIRECTION_STRIDE)
+from .forward_model import DIRECTIONS, is_decision_tick
+
+
+# Q(s, a) = w_global . global_block(s) + w_dir . direction_block(s, a):
+# one weight vector shared by all four moves, so what is learned about
+# "right" carries over to the other directions. Each direction block gets
+# one extra, nonlinear term: ghost closeness, 1 at the ghost's tile and 0
+# beyond 1 / CLOSE_SCALE of the maze span, so the linear model can tell
+# "a ghost is right there" from "ghosts are a bit closer".
+CLOSE_SCALE = 16.0
+DIRECTION_WEIGHTS = DIRECTION_STRIDE + 1
+NUM_WEIGHTS = DIRECTION_OFFSET + DIRECTION_WEIGHTS
+
+# Where train.py writes and QLearningController looks by default
+DEFAULT_CHECKPOINT = os.path.join("checkpoints", "qlearning.npz")
+
+
+def initial_weights():
+    """Small prior so an untrained agent already walks to pellets and away from ghosts"""
+    w = np.zeros(NUM_WEIGHTS, dtype=np.float64)
+    d = DIRECTION_OFFSET
+    w[d + 1] = 0.5    # pellet_here
+    w[d + 2] = -1.0   # pellet_dist
+    w[d + 3] = 2.0    # ghost_dist
+    w[d + 4] = -0.5   # vulnerable_dist
+    w[d + 5] = -2.0   # ghost closeness
+    return w
+
+
+def split_features(features):
+    """(..., NUM_FEATURES) -> global block (..., 8), direction blocks (..., 4, 6), legal (..., 4)"""
+    features = np.asarray(features, dtype=np.float64)
+    glob = features[..., :DIRECTION_OFFSET]
+    blocks = features[..., DIRECTION_OFFSET:].reshape(features.shape[:-1] + (4, DIRECTION_STRIDE))
+    close = np.maximum(1.0 - blocks[..., 3:4] * CLOSE_SCALE, 0.0)
+    return glob, np.concatenate([blocks, close], axis=-1), blocks[..., 0] > 0.5
+
+
+class ApproximateQAgent:
+    """
+    Linear Q-function over the fixed feature layout.
+
+    update() takes a batch of transitions (as collected by train.py) and
+    applies minibatch semi-gradient Q-learning steps; targets bootstrap from
+    the best legal move in the next state, or 0 when the episode ended.
+    """
+
+    def __init__(self, weights=None, alpha=0.01, gamma=0.95, batch_size=256,
+                 clip=10.0):
+        self.weights = initial_weights() if weights is None else np.array(weights, dtype=np.float64)
+        if self.weights.shape != (NUM_WEIGHTS,):
+            raise ValueError(f"Expected {NUM_WEIGHTS} weights, got {self.weights.shape}")
+        self.alpha = alpha
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.clip = clip          # TD errors are clipped to +-clip
+        self.updates = 0          # transitions learned from (saved in checkpoints)
+
+    # ----------------------------------------------------------
+    def q_values(self, features, weights=None):
+        """(..., NUM_FEATURES) -> (..., 4) Q-values, -inf for moves into walls"""
+        w = self.weights if weights is None else weights
+        glob, dirs, legal = split_features(features)
+        q = (glob @ w[:DIRECTION_OFFSET])[..., None] + dirs @ w[DIRECTION_OFFSET:]
+        return np.where(legal, q, -np.inf)
+
+    def greedy(self, features):
+        """Best move index for one feature vector (-1 if boxed in)"""
+        q = self.q_values(features)
+        return int(np.argmax(q)) if np.isfinite(q).any() else -1
+
+    def act(self, features, epsilon, rng):
+        """Epsilon-greedy move index; rng is a random.Random"""
+        if epsilon > 0 and rng.random() < epsilon:
+            legal = np.flatnonzero(split_features(features)[2])
+            return int(rng.choice(legal)) if len(legal) else -1
+        return self.greedy(features)
+
+    def update(self, states, actions, rewards, next_states, dones, rng=None):
+        """
+        Learn from a batch of transitions; returns the mean |TD error|.
+        states, next_states : (N, NUM_FEATURES)
+        actions             : (N,) move indices
+        rewards, dones      : (N,)
+        """
+        n = len(actions)
+        if n == 0:
+            return 0.0
+        order = np.arange(n)
+        if rng is not None:
+            order = rng.permutation(n)
+
+        # phi(s, a): global block + the chosen direction's block
+        glob, dirs, _ = split_features(states)
+        phi = np.concatenate([glob, dirs[np.arange(n), actions]], axis=1)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        live = 1.0 - np.asarray(dones, dtype=np.float64)
+
+        total = 0.0
+        for start in range(0, n, self.batch_size):
+            rows = order[start:start + self.batch_size]
+            # Targets use the current weights for every minibatch
+            next_q = self.q_values(next_states[rows]).max(axis=1)
+            next_q = np.where(np.isfinite(next_q), next_q, 0.0)
+            target = rewards[rows] + self.gamma * live[rows] * next_q
+            td = np.clip(target - phi[rows] @ self.weights, -self.clip, self.clip)
+            self.weights += self.alpha * (td @ phi[rows]) / len(rows)
+            total += np.abs(td).sum()
+
+        self.updates += n
+        return total / n
+
+    # ----------------------------------------------------------
+    def save(self, path, **meta):
+        """Write weights (+ feature layout and any extra metadata) to an .npz checkpoint"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, weights=self.weights, feature_names=np.array(FEATURE_NAMES),
+                 alpha=self.alpha, gamma=self.gamma, updates=self.updates,
+                 **{f"meta_{k}": v for k, v in meta.items()})
+
+    @classmethod
+    def load(cls, path):
+        """Agent from a checkpoint written by save(); refuses other feature layouts"""
+        with np.load(path) as data:
+            if list(data["feature_names"]) != FEATURE_NAMES:
+                raise ValueError(f"{path}: feature layout differs from FEATURE_NAMES")
+            agent = cls(data["weights"], alpha=float(data["alpha"]), gamma=float(data["gamma"]))
+            agent.updates = int(data["updates"])
+        return agent
+
+
+class QLearningController:
+    """
+    Greedy policy of a trained ApproximateQAgent.
+
+    Picks a move only on ticks where Pac-Man actually moves and keeps the
+    current heading in between. Loads `checkpoint` if it exists; otherwise
+    it plays with the initial prior weights.
+    """
+
+    # Decides every move itself (no threat / chase layers in the engine)
+    standalone = True
+
+    def __init__(self, checkpoint=DEFAULT_CHECKPOINT, agent=None, epsilon=0.0, seed=None):
+        if agent is None:
+            if checkpoint and os.path.exists(checkpoint):
+                agent = ApproximateQAgent.load(checkpoint)
+            else:
+                agent = ApproximateQAgent()
+        self.agent = agent
+        self.epsilon = epsilon
+        self.rng = SplitMixRandom(seed)
+        self.extractor = FeatureExtractor()
+
+    def copy(self):
+        """Same agent (weights are shared, not reloaded) with a copy of the rng"""
+        other = QLearningController.__new__(QLearningController)
+        other.__dict__.update(self.__dict__)
+        other.rng = self.rng.copy()
+        return other
+
+    def choose_action(self, engine):
+        """
+        Decide Pacman's next move based on the current game engine state.
+        Returns (dx, dy) move tuple.
+        """
+        if not is_decision_tick(engine):
+            return engine.pacman.direction
+        action = self.agent.act(self.extractor.extract(engine), self.epsilon, self.rng)
+        return DIRECTIONS[action] if action >= 0 else (0, 0)
@@ -0,0 +1,315 @@
+# ai_modules/route_planner.py
+# Pellet tour: the remaining pellets visited in a short maze-distance order
+
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+# Planned tours, shared by every planner: a reset or a clone on the same
+# board starts from the same tile with the same pellets, so it reuses the
+# tour instead of re-planning it
+MAX_CACHED_TOURS = 64
+_TOUR_CACHE = OrderedDict()
+
+
+class PelletRoutePlanner:
+    """
+    Plans the order in which the remaining pellets are eaten.
+
+    The tour is built on PathTable distances:
+      1. pellets (normal and power) are grouped into clusters of tiles within
+         `cluster_radius` maze steps of a leader pellet
+      2. the clusters are ordered from Pac-Man's tile by nearest neighbour
+         plus 2-opt over the leaders
+      3. each cluster is expanded into its pellets (nearest neighbour from
+         where the previous cluster ended), and 2-opt polishes the whole
+         pellet sequence
+    Pac-Man then walks to the first pellet of the tour that is still there.
+
+    The tour is repaired rather than rebuilt:
+      - eaten pellets (on the route or not) are skipped lazily
+      - when Pac-Man ends up farther from the next pellet than on the
+        previous call (a ghost forced a detour), only the first
+        `repair_window` pellets are re-ordered with 2-opt, from Pac-Man's
+        new tile to the unchanged rest of the tour
+    It is planned from scratch only for a new layout or when pellets come
+    back (reset / new level), and planned tours are cached by (layout,
+    start node, pellet set), so restarting a level reuses its tour. A
+    planning polish runs at most `max_passes` improvement passes (4 reach
+    the local optimum on the bundled levels), a repair `repair_passes`.
+
+    `version` changes whenever the tour's head may have changed (rebuild,
+    repair, a pellet dropped off the front); callers caching decisions key
+    on state_key().
+    """
+
+    def __init__(self, cluster_radius=3, repair_window=8, max_passes=4, repair_passes=1):
+        self.cluster_radius = cluster_radius
+        self.repair_window = repair_window
+        self.max_passes = max_passes
+        self.repair_passes = repair_passes
+
+        self._paths = None
+        self._food = set()       # tiles the tour still covers
+        self._pending = set()    # their path table nodes
+        self.tour = deque()      # pellet nodes in visiting order
+        self._target_dist = None
+        self.version = 0
+        # (engine.zobrist, _advance() result) of the board last synced with
+        self._board = None
+
+        # counters (for tuning / reports)
+        self.rebuilds = 0
+        self.repairs = 0
+
+    # ----------------------------------------------------------
+    def next_step(self, engine):
+        """(dx, dy) toward the next pellet on the tour, or None if nothing is left"""
+        target = self.next_target(engine)
+        if target is None:
+            return None
+        return engine.paths.next_step((engine.pacman.tx, engine.pacman.ty), target)
+
+    def next_target(self, engine):
+        """Tile of the pellet Pac-Man should go for next (None if none left)"""
+        pac = self._advance(engine)
+        if pac is None:
+            return None
+
+        paths = engine.paths
+        d = int(paths.dist[pac, self.tour[0]])
+        # Moving away from the next pellet means a detour happened
+        if self._target_dist is not None and d > self._target_dist:
+            self._repair(paths, pac)
+            d = int(paths.dist[pac, self.tour[0]])
+        self._target_dist = d
+        return paths.nodes[self.tour[0]]
+
+    def state_key(self, engine):
+        """
+        Planner state next_step() depends on besides the board (the tour is
+        brought up to date with the board first): with the same board and
+        state_key() it returns the same step
+        """
+        pac = self._advance(engine)
+        d = self._target_dist
+        if pac is None or d is None:
+            return (self.version, False)
+        # whether next_target() is about to repair
+        return (self.version, int(engine.paths.dist[pac, self.tour[0]]) > d)
+
+    def reset(self):
+        """Forget the tour (the next call rebuilds it)"""
+        self._paths = None
+        self._food = set()
+        self._pending = set()
+        self.tour = deque()
+        self._target_dist = None
+        self._board = None
+        self.version += 1
+
+    def copy(self):
+        """Planner with the same settings and its own copy of the tour"""
+        other = PelletRoutePlanner.__new__(PelletRoutePlanner)
+        other.__dict__.update(self.__dict__)
+        other._food = set(self._food)
+        other._pending = set(self._pending)
+        other.tour = deque(self.tour)
+        return other
+
+    def tour_length(self, start):
+        """Maze steps of the remaining tour from node `start`"""
+        return self._length(self._paths, start, [n for n in self.tour if n in self._pending])
+
+    # ----------------------------------------------------------
+    def _advance(self, engine):
+        """
+        Sync with the board and drop eaten pellets off the front of the
+        tour. Returns Pac-Man's node, or None if there is nothing to go for.
+        Nothing to do on a board it was already synced with (the decision
+        cache asks several times per tick).
+        """
+        if self._board is not None and self._board[0] == engine.zobrist \
+                and engine.paths is self._paths:
+            return self._board[1]
+        self._sync(engine)
+        pac = engine.paths.index.get((engine.pacman.tx, engine.pacman.ty))
+        if pac is None:
+            return None
+
+        tour = self.tour
+        while tour and tour[0] not in self._pending:
+            tour.popleft()
+            self._target_dist = None
+            self.version += 1
+        self._board = (engine.zobrist, pac if tour else None)
+        return self._board[1]
+
+    def _sync(self, engine):
+        """Rebuild for a new layout / refilled board, else forget eaten pellets"""
+        count = len(engine.pellets) + len(engine.power_pellets)
+        if engine.paths is not self._paths or count > len(self._food):
+            self._rebuild(engine)
+            return
+        if count == len(self._food):
+            return
+
+        eaten = self._food - engine.pellets - engine.power_pellets
+        index = engine.paths.index
+        self._pending.difference_update(index[t] for t in eaten)
+        self._food -= eaten
+
+    def _rebuild(self, engine):
+        paths = engine.paths
+        self._paths = paths
+        self._food = {t for t in engine.pellets | engine.power_pellets if t in paths.index}
+        self._pending = {paths.index[t] for t in self._food}
+        self._target_dist = None
+        self.rebuilds += 1
+        self.version += 1
+
+        pac = paths.index.get((engine.pacman.tx, engine.pacman.ty))
+        if pac is None or not self._pending:
+            self.tour = deque(self._pending)
+            return
+
+        key = (paths, pac, frozenset(self._pending), self.cluster_radius, self.max_passes)
+        tour = _TOUR_CACHE.get(key)
+        if tour is None:
+            tour = _TOUR_CACHE[key] = self._plan_tour(paths, pac)
+            if len(_TOUR_CACHE) > MAX_CACHED_TOURS:
+                _TOUR_CACHE.popitem(last=False)
+        else:
+            _TOUR_CACHE.move_to_end(key)
+        self.tour = deque(tour)
+
+    def _plan_tour(self, paths, pac):
+        """Tour over the pending pellets from node pac (a tuple of nodes)"""
+        # Coarse order over clusters, then pellets inside each cluster
+        clusters = self._clusters(paths)
+        order = self._plan(paths, pac, [c[0] for c in clusters])
+        route = []
+        here = pac
+        for k in order:
+            chain = self._nearest_neighbour(paths, here, clusters[k])
+            route.extend(chain)
+            here = chain[-1]
+
+        # 2-opt gets stuck in different local optima from the clustered and
+        # the plain nearest neighbour start; keep the shorter tour
+        passes = self.max_passes
+        tours = [self._polish(paths, pac, route, passes=passes)]
+        if len(clusters) < len(self._pending):
+            start = self._nearest_neighbour(paths, pac, self._pending)
+            tours.append(self._polish(paths, pac, start, passes=passes))
+        return tuple(min(tours, key=lambda t: self._length(paths, pac, t)))
+
+    def _clusters(self, paths):
+        """
+        Leader clustering: a pellet joins the first cluster whose leader is
+        within cluster_radius, else it leads a new one. Returns node lists,
+        leader first.
+        """
+        clusters, leaders = [], []
+        for node in sorted(self._pending, key=lambda n: paths.nodes[n][::-1]):
+            if leaders:
+                d = paths.dist[leaders, node]
+                k = int(d.argmin())
+                if d[k] <= self.cluster_radius:
+                    clusters[k].append(node)
+                    continue
+            leaders.append(node)
+            clusters.append([node])
+        return clusters
+
+    # ----------------------------------------------------------
+    @staticmethod
+    def _length(paths, start, route):
+        points = [start] + list(route)
+        return int(paths.dist[points[:-1], points[1:]].sum())
+
+    @staticmethod
+    def _nearest_neighbour(paths, start, nodes):
+        """nodes ordered by repeatedly stepping to the closest one left"""
+        left = list(nodes)
+        chain = []
+        here = start
+        while left:
+            d = paths.dist[here, left]
+            here = left.pop(int(d.argmin()))
+            chain.append(here)
+        return chain
+
+    def _plan(self, paths, start, nodes):
+        """Indices of `nodes` in nearest neighbour + 2-opt order from `start`"""
+        chain = self._nearest_neighbour(paths, start, nodes)
+        position = {n: i for i, n in enumerate(nodes)}
+        return [position[n] for n in self._polish(paths, start, chain, passes=self.max_passes)]
+
+    @staticmethod
+    def _polish(paths, start, route, end=None, passes=None):
+        """
+        2-opt plus or-opt (moving runs of up to 3 pellets) on the path
+        start -> route -> end; start and end stay put, the route in between
+        is reordered until neither move shortens it, or for at most
+        `passes` rounds. An open end is a virtual node at distance 0 from
+        everything.
+        """
+        route = list(route)
+        points = [start] + route + [start if end is None else end]
+        D = paths.dist[np.ix_(points, points)].astype(np.int64)
+        if end is None:
+            D[:, -1] = D[-1, :] = 0
+        m = len(points)
+        order = np.arange(m)
+
+        improved = True
+        while improved and passes != 0:
+            improved = False
+            if passes is not None:
+                passes -= 1
+
+            # 2-opt: reverse order[i+1 .. k] (best k for every i)
+            for i in range(0, m - 3):
+                a, b = order[i], order[i + 1]
+                c, d = order[i + 2:m - 1], order[i + 3:m]
+                delta = D[a, c] + D[b, d] - D[a, b] - D[c, d]
+                k = int(delta.argmin())
+                if delta[k] < 0:
+                    k += i + 2
+                    order[i + 1:k + 1] = order[i + 1:k + 1][::-1].copy()
+                    improved = True
+
+            # or-opt: move the run order[i .. r] between order[j] and order[j + 1]
+            for size in (1, 2, 3):
+                i = 1
+                while i + size <= m - 1:
+                    r = i + size - 1
+                    p, x, y, q = order[i - 1], order[i], order[r], order[r + 1]
+                    removed = D[p, x] + D[y, q] - D[p, q]
+                    js = np.concatenate((np.arange(0, i - 1), np.arange(r + 1, m - 1)))
+                    u, v = order[js], order[js + 1]
+                    delta = D[u, x] + D[y, v] - D[u, v] - removed
+                    if not len(js) or delta.min() >= 0:
+                        i += 1
+                        continue
+                    j = int(js[delta.argmin()])
+                    run = order[i:r + 1].copy()
+                    order = np.delete(order, np.s_[i:r + 1])
+                    j = j if j < i else j - size
+                    order = np.insert(order, j + 1, run)
+                    improved = True
+
+        return [points[j] for j in order[1:m - 1]]
+
+    def _repair(self, paths, pac):
+        """Re-order the head of the tour from Pac-Man's current tile"""
+        self.repairs += 1
+        self.version += 1
+        live = [n for n in self.tour if n in self._pending]
+        window = live[:self.repair_window]
+        rest = live[self.repair_window:]
+        end = rest[0] if rest else None
+        head = self._nearest_neighbour(paths, pac, window)
+        self.tour = deque(self._polish(paths, pac, head, end, self.repair_passes) + rest)
@@ -0,0 +1,331 @@
+# benchmarks/run_benchmarks.py
+# Hot-path benchmarks for the engine, AI and renderer, with baseline comparison
+#
+#   python -m benchmarks.run_benchmarks                  # run + compare to baseline
+#   python -m benchmarks.run_benchmarks --save-baseline  # refresh the baseline
+#   python -m benchmarks.run_benchmarks --quick --output results.json
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from environment.game_engine import GameEngine
+from environment.levels import LEVELS, LEVEL_ORDER
+from environment.maze import Maze
+from ai_modules.feature_extractor import FeatureExtractor
+from ai_modules.forward_model import is_decision_tick
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.25   # 25% slower than baseline counts as a regression
+# Rates (e.g. deadline misses) are compared as if they were at least this: a
+# few percent of misses come and go with machine load
+MIN_RATIO = 0.05
+
+
+# ----------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------
+def _metric(value, unit, higher_is_better):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _percentiles_us(samples, prefix, out):
+    samples = np.asarray(samples) * 1e6
+    for p in (50, 90, 99):
+        out[f"{prefix}.p{p}"] = _metric(np.percentile(samples, p), "us", False)
+
+
+def _variations():
+    for level_name in LEVEL_ORDER:
+        for variation in range(len(LEVELS[level_name])):
+            yield level_name, variation
+
+
+def _play(engine, ticks):
+    """Step an engine for `ticks`, restarting the level whenever it ends"""
+    for _ in range(ticks):
+        _, done, _ = engine.step()
+        if done:
+            engine.reset()
+
+
+# ----------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------
+def bench_headless_steps(ticks, repeats=3):
+    """Headless autopilot steps/sec for every level variation (best of `repeats`)"""
+    out = {}
+    for level_name, variation in _variations():
+        best = 0.0
+        for _ in range(repeats):
+            engine = GameEngine(level_name=level_name, variation=variation,
+                                headless=True, seed=0)
+            _play(engine, 30)   # warm caches (path tables etc.)
+
+            start = time.perf_counter()
+            _play(engine, ticks)
+            best = max(best, ticks / (time.perf_counter() - start))
+        out[f"headless.{level_name}.{variation}.steps_per_sec"] = \
+            _metric(best, "steps/s", True)
+    return out
+
+
+def bench_ai_latency(decisions, spacing=8):
+    """
+    Per-decision latency percentiles for the autopilot and feature extractor,
+    sampled every `spacing` ticks or more (the next tick Pac-Man moves on)
+    """
+    out = {}
+    extractor = FeatureExtractor()
+
+    variations = list(_variations())
+    per_level = max(1, decisions // len(variations))
+
+    features = []      # feature extraction, on every controller's boards
+    for name in ("hybrid", "mcts", "anytime", "expectimax"):
+        samples = []
+        rollouts = searched = 0
+        misses = decided = 0
+        depths = {}        # level -> search depths reached (depth-limited search)
+        for level_name, variation in variations:
+            engine = GameEngine(level_name=level_name, variation=variation,
+                                headless=True, seed=1, controller=name)
+            extractor.extract(engine)   # per-layout tables are built once, untimed
+            for _ in range(per_level):
+                # time ticks Pac-Man moves on: the search controllers only plan there
+                while engine.game_over or not is_decision_tick(engine):
+                    if engine.game_over:
+                        engine.reset()
+                    else:
+                        engine.step()
+                # the engine's own decision path, one call per tick
+                controller = engine.controller
+                if getattr(controller, "standalone", False):
+                    controller.reset()   # time a real search, not a cached move or resumed tree
+                    start = time.perf_counter()
+                    controller.choose_action(engine)
+                    samples.append(time.perf_counter() - start)
+                    if getattr(controller, "last_rollouts", 0):
+                        rollouts += controller.last_rollouts
+                        searched += controller.last_latency
+                        controller.last_rollouts = 0
+                    if getattr(controller, "last_nodes", 0):
+                        depths.setdefault(level_name, []).append(controller.last_depth)
+                else:
+                    start = time.perf_counter()
+                    engine._layered_autopilot()
+                    samples.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                extractor.extract(engine)
+                features.append(time.perf_counter() - start)
+
+                # advance Pac-Man to a fresh decision point
+                for _ in range(spacing):
+                    engine.step()
+                    if engine.game_over:
+                        break
+
+            if hasattr(controller, "deadline_misses"):
+                misses += controller.deadline_misses
+                decided += controller.decisions
+            if getattr(controller, "total_time", 0):
+                # per level, so max_depth / time_limit can be tuned per level
+                key = f"ai.{name}.{level_name}.nodes_per_sec"
+                out[key] = _metric(max(out[key]["value"] if key in out else 0.0,
+                                       controller.nodes_per_sec), "nodes/s", True)
+
+        _percentiles_us(samples, f"ai.{name}.decision", out)
+        if decided:
+            out[f"ai.{name}.deadline_miss_rate"] = _metric(misses / decided, "ratio", False)
+        for level_name, reached in depths.items():
+            out[f"ai.{name}.{level_name}.mean_depth"] = _metric(np.mean(reached), "plies", True)
+        if searched:
+            out[f"ai.{name}.rollouts_per_sec"] = _metric(rollouts / searched, "rollouts/s", True)
+    _percentiles_us(features, "ai.feature_extract", out)
+    return out
+
+
+def bench_feature_batch(batch, repeats=5):
+    """
+    FeatureExtractor.extract_batch time per engine: `batch` engines of one
+    layout per call, boards spread over the level (best of `repeats`)
+    """
+    extractor = FeatureExtractor()
+    per_engine = []
+    for level_name, variation in _variations():
+        engines = []
+        for i in range(batch):
+            engine = GameEngine(level_name=level_name, variation=variation,
+                                headless=True, seed=i)
+            _play(engine, 3 * i)
+            engines.append(engine)
+        extractor.extract_batch(engines)   # per-layout tables are built once, untimed
+
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            extractor.extract_batch(engines)
+            best = min(best, time.perf_counter() - start)
+        per_engine.append(best / batch)
+    return {"ai.feature_extract_batch.per_engine":
+            _metric(np.mean(per_engine) * 1e6, "us", False)}
+
+
+def _open_maze(size):
+    """Square maze with a wall border and a regular grid of pillars"""
+    rows = []
+    for y in range(size):
+        if y in (0, size - 1):
+            rows.append("%" * size)
+            continue
+        row = ["%"]
+        for x in range(1, size - 1):
+            row.append("%" if x % 2 == 0 and y % 2 == 0 else " ")
+        row.append("%")
+        rows.append("".join(row))
+    return rows
+
+
+def bench_bfs(repeats, sizes=(15, 31, 63, 127)):
+    """Maze.bfs_distance_grid time vs maze size (single source, whole maze; best run)"""
+    out = {}
+    for size in sizes:
+        maze = Maze(_open_maze(size))
+        start_tile = [(1, 1)]
+        n = max(1, repeats * 31 // size)
+        samples = []
+        for _ in range(n):
+            t = time.perf_counter()
+            maze.bfs_distance_grid(start_tile)
+            samples.append(time.perf_counter() - t)
+        out[f"bfs.{size}x{size}.min"] = _metric(min(samples) * 1e6, "us", False)
+    return out
+
+
+def bench_render(frames):
+    """Renderer.render frame time with the SDL dummy video driver"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    try:
+        import pygame
+    except ImportError:
+        return {}
+    from environment.renderer import Renderer
+
+    pygame.init()
+    out = {}
+    for level_name, variation in _variations():
+        engine = GameEngine(level_name=level_name, variation=variation,
+                            headless=True, seed=2)
+        renderer = Renderer(engine)
+        screen = pygame.display.set_mode((renderer.width, renderer.height))
+
+        samples = []
+        for _ in range(frames):
+            engine.step()
+            if engine.game_over:
+                engine.reset()
+            start = time.perf_counter()
+            renderer.render(screen)
+            samples.append(time.perf_counter() - start)
+        out[f"render.{level_name}.{variation}.frame.median"] = \
+            _metric(np.median(samples) * 1e6, "us", False)
+    pygame.quit()
+    return out
+
+
+# ----------------------------------------------------------
+# Runner / comparison
+# ----------------------------------------------------------
+def run_all(quick=False):
+    # Quick runs take fewer samples of the same workloads (same game phases,
+    # same batch size; the cheap BFS and render runs are not cut), so they
+    # compare against a full-run baseline
+    scale = 0.2 if quick else 1.0
+    results = {}
+    results.update(bench_headless_steps(int(3000 * scale)))
+    results.update(bench_ai_latency(int(300 * scale), spacing=int(8 / scale)))
+    results.update(bench_feature_batch(64, repeats=1 if quick else 5))
+    results.update(bench_bfs(200))
+    results.update(bench_render(300))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": np.__version__,
+            "quick": quick,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare two result dicts. Returns a list of
+    (name, baseline_value, current_value, change, regressed) rows, where
+    change > 0 always means "got slower".
+    """
+    rows = []
+    for name, cur in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None or not base["value"]:
+            continue
+        if cur["higher_is_better"]:
+            change = base["value"] / cur["value"] - 1 if cur["value"] else float("inf")
+        elif cur["unit"] == "ratio":
+            change = max(cur["value"], MIN_RATIO) / max(base["value"], MIN_RATIO) - 1
+        else:
+            change = cur["value"] / base["value"] - 1
+        rows.append((name, base["value"], cur["value"], change, change > tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine / AI / renderer benchmarks")
+    parser.add_argument("--quick", action="store_true", help="~5x shorter runs")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    current = run_all(args.quick)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(current, indent=2, sort_keys=True))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows = compare(current, baseline, args.tolerance)
+    regressions = [r for r in rows if r[4]]
+    for name, base, cur, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<48}{base:>12.1f}{cur:>12.1f}{100 * change:>+9.1f}%  {flag}")
+    print(f"\n{len(regressions)} regression(s) over {100 * args.tolerance:.0f}% "
+          f"across {len(rows)} metrics")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,13 @@
 from .game_engine import GameEngine
 from .maze import Maze
 from .entities import Pacman, Ghost
-from .renderer import Renderer
 
 __all__ = ["GameEngine", "Maze", "Pacman", "Ghost", "Renderer"]
+
+
+def __getattr__(name):
+    # Renderer pulls in pygame; import it lazily so headless runs stay display-free
+    if name == "Renderer":
+        from .renderer import Renderer
+        return Renderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
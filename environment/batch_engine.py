@@ -0,0 +1,362 @@
+# environment/batch_engine.py
+# Vectorized environment: N Pac-Man games advanced in lockstep with NumPy
+
+import numpy as np
+
+from .levels import LEVELS, LEVEL_ORDER
+from .maze import Maze
+from .path_table import get_path_table, layout_key, UNREACHABLE
+from .game_engine import FIXED_DT
+
+
+# Action indices (same order the engine's AI helpers scan directions)
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+STAY = 4
+REVERSE = np.array([1, 0, 3, 2, STAY])
+
+# Scores / timings mirror GameEngine + entities
+PELLET_SCORE = 10
+POWER_SCORE = 25
+GHOST_SCORE = 50
+VULNERABLE_TIME = 5.0
+
+PACMAN_NORMAL_DELAY = 0.25
+PACMAN_BOOST_DELAY = 0.20
+GHOST_NORMAL_DELAY = 0.30
+GHOST_VULNERABLE_DELAY = 1.00
+
+# Tile an eaten ghost is sent back to (same as GameEngine)
+GHOST_RESPAWN = (1, 1)
+
+# Open-direction bitmasks (bit d = DIRECTIONS[d] is open) -> per-mask tables
+MASK_COUNT = np.array([bin(m).count("1") for m in range(16)], dtype=np.int64)
+# k-th open direction of a mask (0 where there is none)
+MASK_PICK = np.array([[d for d in range(4) if m >> d & 1] + [0] * (4 - MASK_COUNT[m])
+                      for m in range(16)], dtype=np.int64)
+# Ghost turns: the mask minus the reversal of heading h unless that's the
+# only exit (h = STAY before the first move), at [mask, h]
+TURN_MASK = np.array([[m & ~(1 << REVERSE[h]) if h != STAY and m != 1 << REVERSE[h] else m
+                       for h in range(5)] for m in range(16)], dtype=np.int64)
+
+
+class BatchGameEngine:
+    """
+    Holds N games as struct-of-arrays NumPy state and steps them together.
+
+    Every maze is padded with walls to a common (height, width) and tiles are
+    addressed by flat index (y * width + x), so movement, pellet consumption
+    and collisions are a handful of array ops for the whole batch.
+    """
+
+    # ----------------------------------------------------------
+    def __init__(self, maps, seed=None, dt=FIXED_DT, max_steps=None):
+        self.num_envs = len(maps)
+        self.dt = dt
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        self._build_layouts(maps)
+        self.reset()
+
+    @classmethod
+    def from_levels(cls, num_envs, level_names=None, seed=None, **kwargs):
+        """Build a batch with random variations of the given levels"""
+        if level_names is None:
+            level_names = LEVEL_ORDER
+        rng = np.random.default_rng(seed)
+
+        maps = []
+        for i in range(num_envs):
+            variations = LEVELS[level_names[i % len(level_names)]]
+            maps.append(variations[rng.integers(len(variations))])
+        return cls(maps, seed=seed, **kwargs)
+
+    # ----------------------------------------------------------
+    def _build_layouts(self, maps):
+        mazes = [Maze(lines) for lines in maps]
+
+        # One wall tile of padding on every side: neighbours never leave the grid
+        self.height = max(m.height for m in mazes) + 2
+        self.width = max(m.width for m in mazes) + 2
+        n, size = self.num_envs, self.height * self.width
+
+        self.walls = np.ones((n, size), dtype=bool)
+        self.start_pellets = np.zeros((n, size), dtype=bool)
+        self.start_power = np.zeros((n, size), dtype=bool)
+        self.start_pacman = np.zeros(n, dtype=np.int64)
+
+        ghost_starts = []
+        for i, maze in enumerate(mazes):
+            ghosts = []
+            pacman = None
+            for y, row in enumerate(maze.raw):
+                for x, ch in enumerate(row):
+                    idx = self.to_index(x, y)
+                    self.walls[i, idx] = maze.is_wall(x, y)
+                    if ch == '.':
+                        self.start_pellets[i, idx] = True
+                    elif ch == 'o':
+                        self.start_power[i, idx] = True
+                    elif ch == 'P':
+                        pacman = idx
+                    elif ch == 'G':
+                        ghosts.append(idx)
+
+            # Default pacman location (same rule as GameEngine)
+            if pacman is None:
+                pacman = self.to_index(maze.width // 2, maze.height // 2)
+            self.start_pacman[i] = pacman
+            ghost_starts.append(ghosts)
+
+        # Ghost slots are padded to the largest ghost count; unused slots are masked
+        max_ghosts = max([len(g) for g in ghost_starts] + [1])
+        self.ghost_mask = np.zeros((n, max_ghosts), dtype=bool)
+        self.start_ghosts = np.zeros((n, max_ghosts), dtype=np.int64)
+        for i, ghosts in enumerate(ghost_starts):
+            self.ghost_mask[i, :len(ghosts)] = True
+            self.start_ghosts[i, :len(ghosts)] = ghosts
+
+        # Maze distances between padded flat indices, one (size, size) table
+        # per distinct wall layout; vulnerable ghosts flee by them
+        slots = {}
+        tables = []
+        self.env_layout = np.zeros(n, dtype=np.int64)
+        for i, maze in enumerate(mazes):
+            key = layout_key(maze)
+            if key not in slots:
+                slots[key] = len(tables)
+                paths = get_path_table(maze)
+                flat = [self.to_index(x, y) for x, y in paths.nodes]
+                table = np.full((size, size), UNREACHABLE, dtype=np.uint16)
+                table[np.ix_(flat, flat)] = paths.dist
+                tables.append(table)
+            self.env_layout[i] = slots[key]
+        self.layout_dist = np.stack(tables)
+
+        # Flat offsets for the four directions (+ stay)
+        self.offsets = np.array([1, -1, self.width, -self.width, 0], dtype=np.int64)
+
+        # Open-direction bitmask of every tile, one row per layout; flat_moves
+        # is indexed by layout_base[env] + tile
+        moves = np.zeros((len(tables), size), dtype=np.int64)
+        inner = np.arange(self.width + 1, size - self.width - 1)
+        for i in np.unique(self.env_layout, return_index=True)[1]:
+            open_ = ~self.walls[i]
+            for d, off in enumerate(self.offsets[:4]):
+                moves[self.env_layout[i], inner] |= open_[inner + off] << d
+        self.flat_moves = moves.ravel()
+        self.layout_base = self.env_layout * size
+        # Row offset of each env inside the flattened (n * size) arrays
+        self.env_base = np.arange(n, dtype=np.int64)[:, None] * size
+        self.respawn = self.to_index(*GHOST_RESPAWN)
+
+    def to_index(self, tx, ty):
+        """Flat index of an (unpadded) tile"""
+        return (ty + 1) * self.width + (tx + 1)
+
+    def to_tile(self, idx):
+        """(tx, ty) of a flat index, in unpadded maze coordinates"""
+        y, x = np.divmod(idx, self.width)
+        return x - 1, y - 1
+
+    # ----------------------------------------------------------
+    def reset(self, env_ids=None):
+        """Reset all games, or only the given env indices"""
+        if env_ids is None:
+            env_ids = np.arange(self.num_envs)
+            n = self.num_envs
+            g = self.ghost_mask.shape[1]
+
+            self.pellets = np.empty_like(self.start_pellets)
+            self.power = np.empty_like(self.start_power)
+            self.pacman = np.empty(n, dtype=np.int64)
+            self.pacman_prev = np.empty(n, dtype=np.int64)
+            self.pacman_dir = np.empty(n, dtype=np.int64)
+            self.pacman_timer = np.empty(n)
+            self.pacman_delay = np.empty(n)
+
+            self.ghosts = np.empty((n, g), dtype=np.int64)
+            self.ghosts_prev = np.empty((n, g), dtype=np.int64)
+            self.ghost_dir = np.empty((n, g), dtype=np.int64)
+            self.ghost_timer = np.empty((n, g))
+            self.ghost_delay = np.empty((n, g))
+            self.ghost_vulnerable = np.empty((n, g), dtype=bool)
+            self.ghost_vulnerable_timer = np.empty((n, g))
+
+            self.pellets_left = np.empty(n, dtype=np.int64)
+            self.score = np.empty(n, dtype=np.int64)
+            self.steps = np.empty(n, dtype=np.int64)
+            self.done = np.empty(n, dtype=bool)
+            self.win = np.empty(n, dtype=bool)
+
+        self.pellets[env_ids] = self.start_pellets[env_ids]
+        self.power[env_ids] = self.start_power[env_ids]
+        self.pacman[env_ids] = self.start_pacman[env_ids]
+        self.pacman_prev[env_ids] = self.start_pacman[env_ids]
+        self.pacman_dir[env_ids] = STAY
+        self.pacman_timer[env_ids] = 0.0
+        self.pacman_delay[env_ids] = PACMAN_NORMAL_DELAY
+
+        self.ghosts[env_ids] = self.start_ghosts[env_ids]
+        self.ghosts_prev[env_ids] = self.start_ghosts[env_ids]
+        self.ghost_dir[env_ids] = STAY
+        self.ghost_timer[env_ids] = 0.0
+        self.ghost_delay[env_ids] = GHOST_NORMAL_DELAY
+        self.ghost_vulnerable[env_ids] = False
+        self.ghost_vulnerable_timer[env_ids] = 0.0
+
+        self.pellets_left[env_ids] = (self.start_pellets[env_ids].sum(axis=1) +
+                                      self.start_power[env_ids].sum(axis=1))
+        self.score[env_ids] = 0
+        self.steps[env_ids] = 0
+        self.done[env_ids] = False
+        self.win[env_ids] = False
+
+    # ----------------------------------------------------------
+    def valid_action_mask(self):
+        """(N, 4) bool: which directions are open from each Pac-Man tile"""
+        nxt = self.pacman[:, None] + self.offsets[None, :4]
+        return ~np.take_along_axis(self.walls, nxt, axis=1)
+
+    def random_actions(self):
+        """Uniformly random open direction for every game"""
+        mask = self.flat_moves[self.layout_base + self.pacman]
+        pick = (self.rng.random(self.num_envs) * MASK_COUNT[mask]).astype(np.int64)
+        return MASK_PICK[mask, pick]
+
+    # ----------------------------------------------------------
+    def step(self, actions=None):
+        """
+        Advance every game by one fixed tick.
+        actions: (N,) ints indexing DIRECTIONS (4 = stay); None keeps the
+        current heading. Returns (rewards, done, info) arrays.
+        """
+        active = ~self.done
+        score_before = self.score.copy()
+        flat_walls = self.walls.ravel()
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            self.pacman_dir = np.where(active, actions, self.pacman_dir)
+
+        # ------------------------------------------------------
+        # PACMAN MOVEMENT
+        # ------------------------------------------------------
+        self.pacman_prev = self.pacman.copy()
+        self.pacman_timer += np.where(active, self.dt, 0.0)
+        moving = active & (self.pacman_timer >= self.pacman_delay)
+        self.pacman_timer[moving] = 0.0
+
+        target = self.pacman + self.offsets[self.pacman_dir]
+        open_tile = ~flat_walls[self.env_base[:, 0] + target]
+        self.pacman = np.where(moving & open_tile, target, self.pacman)
+
+        # ------------------------------------------------------
+        # PELLET CONSUMPTION
+        # ------------------------------------------------------
+        rows = np.arange(self.num_envs)
+        ate = active & self.pellets[rows, self.pacman]
+        self.pellets[rows[ate], self.pacman[ate]] = False
+        self.score += PELLET_SCORE * ate
+
+        powered = active & self.power[rows, self.pacman]
+        self.power[rows[powered], self.pacman[powered]] = False
+        self.score += POWER_SCORE * powered
+        self.pellets_left -= ate.astype(np.int64) + powered
+        self.pacman_delay[powered] = PACMAN_BOOST_DELAY
+
+        scare = powered[:, None] & self.ghost_mask
+        self.ghost_vulnerable |= scare
+        self.ghost_vulnerable_timer[scare] = VULNERABLE_TIME
+        self.ghost_delay[scare] = GHOST_VULNERABLE_DELAY
+
+        # WIN condition (right after consumption, like GameEngine.update):
+        # the winning tick counts, but its ghosts don't move
+        stepped = active.copy()
+        cleared = active & (self.pellets_left == 0)
+        self.win |= cleared
+        self.done |= cleared
+        active &= ~cleared
+
+        # ------------------------------------------------------
+        # GHOST MOVEMENT
+        # ------------------------------------------------------
+        live = active[:, None] & self.ghost_mask
+        self.ghosts_prev = self.ghosts.copy()
+        self.ghost_timer += np.where(live, self.dt, 0.0)
+
+        ticking = live & self.ghost_vulnerable
+        self.ghost_vulnerable_timer -= np.where(ticking, self.dt, 0.0)
+        expired = ticking & (self.ghost_vulnerable_timer <= 0)
+        self.ghost_vulnerable &= ~expired
+        self.ghost_delay[expired] = GHOST_NORMAL_DELAY
+
+        moving = live & (self.ghost_timer >= self.ghost_delay)
+        self.ghost_timer[moving] = 0.0
+        self._move_ghosts(moving)
+
+        # ------------------------------------------------------
+        # COLLISION CHECK
+        # ------------------------------------------------------
+        pac = self.pacman[:, None]
+        pac_prev = self.pacman_prev[:, None]
+        hit = live & ((self.ghosts == pac) |
+                      ((self.ghosts_prev == pac) & (self.ghosts == pac_prev)))
+
+        eaten = hit & self.ghost_vulnerable
+        self.score += GHOST_SCORE * eaten.sum(axis=1)
+        self.ghosts[eaten] = self.respawn
+        self.ghost_vulnerable &= ~eaten
+        self.ghost_delay[eaten] = GHOST_NORMAL_DELAY
+        self.ghost_vulnerable_timer[eaten] = 0.0
+        # after expiries and eaten ghosts alike (Pac-Man's delay is only
+        # read on the next tick)
+        self._restore_pacman_speed(active)
+
+        died = (hit & ~eaten).any(axis=1)
+        self.done |= died
+
+        self.steps += stepped
+        if self.max_steps is not None:
+            self.done |= self.steps >= self.max_steps
+
+        rewards = self.score - score_before
+        info = {"score": self.score, "win": self.win, "steps": self.steps,
+                "pellets_left": self.pellets_left}
+        return rewards, self.done.copy(), info
+
+    # ----------------------------------------------------------
+    def _restore_pacman_speed(self, active):
+        all_normal = ~(self.ghost_vulnerable & self.ghost_mask).any(axis=1)
+        self.pacman_delay[active & all_normal] = PACMAN_NORMAL_DELAY
+
+    def _move_ghosts(self, moving):
+        # Only the ghosts whose timer fired this tick (~1 in 9)
+        env, slot = np.nonzero(moving)
+        if not len(env):
+            return
+        here = self.ghosts[env, slot]
+
+        # Per-layout move tables: open directions, no immediate 180° reversal
+        # unless it is the only way out
+        allowed = TURN_MASK[self.flat_moves[self.layout_base[env] + here],
+                            self.ghost_dir[env, slot]]
+        count = MASK_COUNT[allowed]
+
+        # Uniform pick among the allowed directions: one draw per ghost
+        choice = MASK_PICK[allowed, (self.rng.random(len(env)) * count).astype(np.int64)]
+
+        # Vulnerable ghosts maximize maze distance to Pac-Man (random tie-break)
+        vuln = self.ghost_vulnerable[env, slot]
+        if vuln.any():
+            e, h = env[vuln], here[vuln]
+            cand = h[:, None] + self.offsets[None, :4]
+            keys = self.layout_dist[self.env_layout[e, None], self.pacman[e, None], cand] \
+                + self.rng.random(cand.shape)
+            keys[(allowed[vuln, None] >> np.arange(4) & 1) == 0] = -1.0
+            choice[vuln] = keys.argmax(axis=1)
+
+        move = count > 0
+        env, slot, choice = env[move], slot[move], choice[move]
+        self.ghosts[env, slot] = here[move] + self.offsets[choice]
+        self.ghost_dir[env, slot] = choice
@@ -0,0 +1,200 @@
+# environment/distance_field.py
+# Nearest-pellet distance field, repaired incrementally as pellets are eaten,
+# the ghost threat field shared by the autopilot's danger checks, and the
+# flee field shared by vulnerable ghosts
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+from .path_table import UNREACHABLE
+
+
+INF = float("inf")
+
+
+class PelletDistanceField:
+    """
+    Maze distance from every walkable tile to its nearest remaining pellet,
+    flat-indexed like the maze (y * width + x; INF on walls).
+
+    Built once with a multi-source BFS over the maze's adjacency CSR. Each
+    tile also remembers which pellet it is closest to (`owner`), so eating a
+    pellet only invalidates the tiles that pellet owned; those are re-seeded
+    from the untouched tiles bordering them. The repair cost is proportional
+    to the size of the eaten pellet's region, not to the maze.
+    """
+
+    def __init__(self, maze, pellets):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        self.adj = maze.adj
+        self.adj_start = maze.adj_start
+
+        n = maze.size
+        self.dist = [INF] * n
+        self.owner = [-1] * n
+        self.sources = set()
+
+        adj, adj_start = self.adj, self.adj_start
+        q = deque()
+        for pos in pellets:
+            i = self._tile(pos)
+            if i is None or i in self.sources:
+                continue
+            self.sources.add(i)
+            self.dist[i] = 0
+            self.owner[i] = i
+            q.append(i)
+
+        while q:
+            u = q.popleft()
+            d = self.dist[u] + 1
+            for k in range(adj_start[u], adj_start[u+1]):
+                v = adj[k]
+                if self.dist[v] == INF:
+                    self.dist[v] = d
+                    self.owner[v] = self.owner[u]
+                    q.append(v)
+
+    def _tile(self, pos):
+        """Flat index of walkable tile pos, else None"""
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            if self.maze.walkable[i]:
+                return i
+        return None
+
+    # ----------------------------------------------------------
+    def get_state(self):
+        """Copy of the mutable arrays (for engine snapshots)"""
+        return (self.dist[:], self.owner[:], frozenset(self.sources))
+
+    def set_state(self, state):
+        dist, owner, sources = state
+        self.dist = dist[:]
+        self.owner = owner[:]
+        self.sources = set(sources)
+
+    def copy(self):
+        other = PelletDistanceField.__new__(PelletDistanceField)
+        other.maze = self.maze
+        other.width, other.height = self.width, self.height
+        other.adj, other.adj_start = self.adj, self.adj_start
+        other.dist = self.dist[:]
+        other.owner = self.owner[:]
+        other.sources = set(self.sources)
+        return other
+
+    def distance(self, pos):
+        """Distance from tile pos to the nearest pellet (None if unreachable)"""
+        i = self._tile(pos)
+        if i is None or self.dist[i] == INF:
+            return None
+        return self.dist[i]
+
+    def remove(self, pos):
+        """Pellet at pos was eaten: repair the tiles it was nearest to"""
+        p = self._tile(pos)
+        if p is None or p not in self.sources:
+            return
+        self.sources.discard(p)
+
+        dist, owner = self.dist, self.owner
+        adj, adj_start = self.adj, self.adj_start
+
+        # Region owned by p is connected (owners are inherited along BFS edges)
+        region = [p]
+        owner[p] = -1
+        r = 0
+        while r < len(region):
+            u = region[r]
+            r += 1
+            for k in range(adj_start[u], adj_start[u+1]):
+                v = adj[k]
+                if owner[v] == p:
+                    owner[v] = -1
+                    region.append(v)
+
+        for u in region:
+            dist[u] = INF
+
+        # Seed from the border: tiles outside the region keep valid distances
+        heap = []
+        for u in region:
+            best, best_owner = INF, -1
+            for k in range(adj_start[u], adj_start[u+1]):
+                v = adj[k]
+                if owner[v] != -1 and dist[v] + 1 < best:
+                    best, best_owner = dist[v] + 1, owner[v]
+            if best < INF:
+                dist[u] = best
+                owner[u] = best_owner
+                heap.append((best, u))
+        heapq.heapify(heap)
+
+        # Dijkstra (unit weights) restricted to the invalidated region
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for k in range(adj_start[u], adj_start[u+1]):
+                v = adj[k]
+                if d + 1 < dist[v]:
+                    dist[v] = d + 1
+                    owner[v] = owner[u]
+                    heapq.heappush(heap, (d + 1, v))
+
+
+class GhostThreatField:
+    """
+    Ghost arrival times: for every walkable tile, the number of moves the
+    nearest threatening ghost needs to reach it (INF if none can).
+
+    This is the multi-source BFS distance from all ghost tiles at once. The
+    layout's PathTable already holds every single-source BFS, so the field
+    is the minimum of the ghosts' rows: one vectorized op per rebuild,
+    however many ghosts there are. It respects walls, unlike Manhattan
+    distance. The engine rebuilds it only when a threatening ghost moved
+    (see GameEngine.threat_field), and every danger check shares it.
+    """
+
+    def __init__(self, paths, ghost_tiles):
+        self.index = paths.index
+
+        rows = [self.index[pos] for pos in ghost_tiles if pos in self.index]
+        if not rows:
+            self.dist = [INF] * len(paths.nodes)
+            return
+        dist = paths.dist[rows].min(axis=0).astype(np.float64)
+        dist[dist == UNREACHABLE] = INF
+        self.dist = dist.tolist()
+
+    def distance(self, pos):
+        """Ghost arrival time at tile pos (INF for walls / unreachable tiles)"""
+        i = self.index.get(pos)
+        return INF if i is None else self.dist[i]
+
+
+class FleeField:
+    """
+    Maze distance from Pac-Man's tile to every tile, flat-indexed
+    (y * width + x) so a vulnerable ghost scores each of its moves with one
+    list lookup. Walls and tiles Pac-Man can't reach read UNREACHABLE, i.e.
+    as far away as it gets.
+
+    Like GhostThreatField it is a PathTable row (the BFS from Pac-Man's
+    tile), scattered into maze order. The engine builds it at most once per
+    tick, only while some ghost is vulnerable, and all ghosts share it (see
+    GameEngine.flee_field), so dozens of ghosts cost one build.
+    """
+
+    def __init__(self, paths, pos):
+        dist = np.full(paths.width * paths.height, UNREACHABLE, dtype=np.int64)
+        i = paths.index.get(pos)
+        if i is not None:
+            dist[paths.flat] = paths.dist[i]
+        self.dist = dist.tolist()
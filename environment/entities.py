@@ -1,6 +1,13 @@
 import random
+from operator import attrgetter
+
+from .maze import MOVE_HEADING, NO_HEADING
 
 class Entity:
+    # Mutable per-step attributes captured by get_state()/set_state()
+    STATE_FIELDS = ("tx", "ty", "row", "col", "x", "y")
+    _state_getter = attrgetter(*STATE_FIELDS)
+
     def __init__(self, row, col):
         # tile coords
         self.row = row
@@ -23,6 +30,20 @@ class Entity:
         self.x = px
         self.y = py
 
+    def get_state(self):
+        """Flat tuple of STATE_FIELDS (all immutable values)"""
+        return self._state_getter(self)
+
+    def set_state(self, state):
+        for name, value in zip(self.STATE_FIELDS, state):
+            setattr(self, name, value)
+
+    def copy(self):
+        """Shallow copy (all attributes are immutable values)"""
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        return other
+
     def move(self, dr, dc, maze):
         new_r = self.row + dr
         new_c = self.col + dc
@@ -33,7 +54,14 @@ class Entity:
         
         return False
 
+
 class Pacman(Entity):
+    STATE_FIELDS = Entity.STATE_FIELDS + (
+        "intent", "direction", "autopilot", "score", "move_delay",
+        "time_since_move", "mouth_open", "animation_timer", "prev_tx", "prev_ty",
+    )
+    _state_getter = attrgetter(*STATE_FIELDS)
+
     def __init__(self, row, col):
         super().__init__(row, col)
 
@@ -73,6 +101,12 @@ class Pacman(Entity):
 
 
 class Ghost(Entity):
+    STATE_FIELDS = Entity.STATE_FIELDS + (
+        "state", "move_delay", "time_since_move", "vulnerable_timer",
+        "_last_dx", "_last_dy", "prev_tx", "prev_ty",
+    )
+    _state_getter = attrgetter(*STATE_FIELDS)
+
     def __init__(self, row, col):
         super().__init__(row, col)
 
@@ -87,64 +121,44 @@ class Ghost(Entity):
         self.prev_tx=0
         self.prev_ty=0
 
-    def choose_move(self, maze, pacman_pos):
+        # last move, used to block immediate 180° reversal
+        self._last_dx = 0
+        self._last_dy = 0
 
-        # All possible 4 directions
-        dirs = [(1,0), (-1,0), (0,1), (0,-1)]
+    def choose_move(self, maze, pacman_pos, rng=random, flee=None):
+        # rng: the engine's seeded random.Random (module random by default)
+        # flee: flat list of maze distances from Pacman (the engine's shared
+        #       FleeField.dist); computed here with a BFS if not given
 
-        # Randomize order
-        random.shuffle(dirs)
-
-        # Find ALL valid moves
-        valid_moves = []
-        for dx, dy in dirs:
-            nx = self.tx + dx
-            ny = self.ty + dy
-            if not maze.is_wall(nx, ny):
-                valid_moves.append((dx, dy))
+        # Open directions of this tile minus the 180° reversal (unless it's
+        # the only way out), straight from the maze's per-heading table
+        w = maze.width
+        here = self.ty * w + self.tx
+        heading = MOVE_HEADING.get((self._last_dx, self._last_dy), NO_HEADING)
+        valid_moves = maze.turn_moves[here * 5 + heading]
 
         # If no moves (should never happen), do nothing
         if not valid_moves:
             return (0, 0)
 
-        # --- NEW TRICK: DON’T ALLOW immediate 180° reversal ---
-        # But WITHOUT storing memory in the ghost object
-        # → We infer the previous move from position difference
-        # → Simple, cheap, no state saved
-
-        # Last move = current position - last “tile position”
-        # This works because game_engine moves ghosts only by 1 tile each step
-        last_dx = getattr(self, "_last_dx", 0)
-        last_dy = getattr(self, "_last_dy", 0)
-
-        reverse = (-last_dx, -last_dy)
-
-        # Filter out reverse IF there is any alternative
-        if reverse in valid_moves and len(valid_moves) > 1:
-            valid_moves.remove(reverse)
-        
         # --- RUN AWAY from Pacman if vulnerable ---
-        if self.state == "vulnerable":
-            # Calculate distance from each valid move to Pacman
-            px, py = pacman_pos
-            move_distances = []
+        if self.state == "vulnerable" and len(valid_moves) > 1:
+            if flee is None:
+                px, py = pacman_pos
+                flee = maze.bfs_distances([py * w + px])
+
+            # Keep the moves that MAXIMIZE maze distance from Pacman
+            best = -1
             for dx, dy in valid_moves:
-                nx, ny = self.tx + dx, self.ty + dy
-                dist = abs(nx - px) + abs(ny - py)  # Manhattan distance
-                move_distances.append(((dx, dy), dist))
-            
-            # Choose move that MAXIMIZES distance from Pacman
-            move_distances.sort(key=lambda x: x[1], reverse=True)
-            best_moves = [m for m in move_distances if m[1] == move_distances[0][1]]
-            dx, dy = random.choice(best_moves)[0]
-            
-            # Save last move for next frame
-            self._last_dx = dx
-            self._last_dy = dy
-            return dx, dy
-        
+                d = flee[here + dy * w + dx]
+                if d > best:
+                    best, picks = d, [(dx, dy)]
+                elif d == best:
+                    picks.append((dx, dy))
+            valid_moves = picks
+
         # Choose random valid move
-        dx, dy = random.choice(valid_moves)
+        dx, dy = valid_moves[0] if len(valid_moves) == 1 else rng.choice(valid_moves)
 
         # Save last move ONLY for next *frame's filtering*
         # (not long-term memory, just needed for 180° block)
@@ -0,0 +1,136 @@
+# environment/frame_export.py
+# Offscreen rendering of recorded episodes to raw RGB, PNG sequences or a pipe
+
+import os
+import shlex
+import subprocess
+import sys
+
+# No window needed: render onto a plain Surface
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from .renderer import Renderer
+
+
+# ----------------------------------------------------------
+# Frame sinks: write(frames) takes a batch of raw RGB byte strings
+# ----------------------------------------------------------
+class RawSink:
+    """Concatenated rgb24 frames on a binary stream (file, stdout, ...)"""
+
+    def __init__(self, stream, size, close_stream=False):
+        self.stream = stream
+        self.size = size
+        self.close_stream = close_stream
+
+    def write(self, frames):
+        self.stream.write(b"".join(frames))
+
+    def close(self):
+        self.stream.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+class PNGSink:
+    """One PNG per frame: directory/frame_000000.png, ..."""
+
+    def __init__(self, directory, size, pattern="frame_%06d.png"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.pattern = pattern
+        self.count = 0
+
+    def write(self, frames):
+        for buf in frames:
+            surf = pygame.image.frombuffer(buf, self.size, "RGB")
+            pygame.image.save(surf, os.path.join(self.directory, self.pattern % self.count))
+            self.count += 1
+
+    def close(self):
+        pass
+
+
+class PipeSink(RawSink):
+    """
+    Raw frames into a subprocess' stdin, e.g. an encoder:
+        ffmpeg -y -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps} -i - out.mp4
+    {width}, {height} and {fps} in the command are filled in.
+    """
+
+    def __init__(self, command, size, fps):
+        if isinstance(command, str):
+            command = shlex.split(command)
+        command = [arg.format(width=size[0], height=size[1], fps=fps) for arg in command]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        super().__init__(self.process.stdin, size, close_stream=True)
+
+    def close(self):
+        super().close()
+        self.process.wait()
+
+
+def open_sink(fmt, out, size, fps):
+    """fmt: 'raw' (out = file path or '-' for stdout), 'png' (out = directory), 'pipe' (out = command)"""
+    if fmt == "raw":
+        if out == "-":
+            return RawSink(sys.stdout.buffer, size)
+        return RawSink(open(out, "wb"), size, close_stream=True)
+    if fmt == "png":
+        return PNGSink(out, size)
+    if fmt == "pipe":
+        return PipeSink(out, size, fps)
+    raise ValueError(f"Unknown frame format: {fmt}")
+
+
+# ----------------------------------------------------------
+# Export
+# ----------------------------------------------------------
+def frame_size(engine):
+    """(width, height) of the frames rendered for this engine"""
+    return engine.width_px, engine.height_px + Renderer.HUD_HEIGHT
+
+
+def export_episode(log, sink, every=1, batch_size=64, max_frames=None):
+    """
+    Re-simulate an ActionLog and render it offscreen into `sink`.
+
+    every      : keep one frame per `every` ticks (decimation); the game is
+                 still simulated tick by tick, only skipped frames aren't drawn
+    batch_size : frames handed to the sink per write
+    Animations run on the simulated clock, so the output does not depend
+    on how fast it was produced. Returns the number of frames written.
+    """
+    engine = log.make_engine()
+    renderer = Renderer(engine, time_source=lambda: int(engine.step_time * 1000))
+    surface = pygame.Surface((renderer.width, renderer.height))
+
+    batch = []
+    written = 0
+
+    def emit():
+        renderer.render(surface)
+        batch.append(pygame.image.tobytes(surface, "RGB"))
+
+    emit()   # tick 0
+    for tick, _ in enumerate(log.replay(engine), 1):
+        if max_frames is not None and written + len(batch) >= max_frames:
+            break
+        if tick % every and tick != len(log):
+            continue
+        emit()
+        if len(batch) >= batch_size:
+            sink.write(batch)
+            written += len(batch)
+            batch = []
+
+    if max_frames is not None:
+        batch = batch[:max(0, max_frames - written)]
+    if batch:
+        sink.write(batch)
+        written += len(batch)
+    return written
@@ -1,16 +1,45 @@
 import os
-import random
 import math
+from collections import namedtuple
 
 from .levels import LEVELS, LEVEL_ORDER, LEVEL_MAX_POINTS
-from .maze import Maze, PELLET, POWER, PACMAN, GHOST, WALL, DEFAULT_MAP
+from .maze import Maze, PELLET, POWER, PACMAN, GHOST, WALL, DEFAULT_MAP, MOVE_BITS, MASK_MOVES
 from .entities import Pacman, Ghost
+from .path_table import get_path_table, UNREACHABLE
+from .distance_field import PelletDistanceField, GhostThreatField, FleeField, INF
+from .zobrist import get_zobrist_table
 from ai_modules.controller import HybridController
+from ai_modules.mcts_controller import MCTSController
+from ai_modules.q_learning import QLearningController
+from ai_modules.anytime_controller import AnytimeController
+from ai_modules.expectimax_controller import ExpectimaxController
+from utils.rng import SplitMixRandom
 
 
 TILE_SIZE = 28
 HIGHSCORE_FILE = "highscore.txt"
 
+# Fixed simulation tick used by headless stepping (matches main.py FPS)
+FIXED_DT = 1.0 / 30
+
+# Autopilot controllers selectable by name
+CONTROLLERS = {
+    "hybrid": HybridController,
+    "mcts": MCTSController,
+    "qlearn": QLearningController,
+    "anytime": AnytimeController,   # MCTS under a 5 ms decision deadline
+    "expectimax": ExpectimaxController,
+}
+
+
+# Compact copy of everything that changes while a level is played.
+# Entities are flat tuples, pellets frozensets; maze / path table are shared.
+EngineSnapshot = namedtuple("EngineSnapshot", [
+    "maze", "paths", "original_map", "level",
+    "pacman", "ghosts", "pellets", "power_pellets", "pellet_field",
+    "flags", "rng", "ai_rng", "zobrist",
+])
+
 
 # ----------------------------------------------------------
 # Persistent Highscore (Level-wise) - MODULE LEVEL FUNCTIONS
@@ -39,23 +68,42 @@ def save_highscore_for_level(level_name, score):
 class GameEngine:
 
     # ----------------------------------------------------------
-    def __init__(self, map_lines=None, level_name=None):
+    def __init__(self, map_lines=None, level_name=None, headless=False, variation=None,
+                 seed=None, controller="hybrid"):
+        # Headless mode: no display, no highscore files, fixed-tick stepping
+        self.headless = headless
+        self.fixed_dt = FIXED_DT
+
+        # Per-engine randomness: one stream for the world (variations, ghosts),
+        # one for the autopilot, so replays and search branches are reproducible
+        self.seed = seed
+        self.rng = SplitMixRandom(seed)
+        self.ai_rng = SplitMixRandom(None if seed is None else f"{seed}:ai")
+        self.undo_stack = []
+
         # Level management
         self.current_level_index = 0
         self.current_level_name = LEVEL_ORDER[0]  # Start with beginner
         self.current_variation = 0
         self.all_levels_complete = False
         
-        # Persistent highscores (level-wise)
-        self.highscores = self.load_all_highscores()
+        # Persistent highscores (level-wise); headless runs never touch the files
+        if headless:
+            self.highscores = {level: 0 for level in LEVEL_ORDER}
+        else:
+            self.highscores = self.load_all_highscores()
         
         # Load map
         if map_lines is None:
             if level_name is None:
                 level_name = self.current_level_name
-            # Randomly select variation
+            self.current_level_name = level_name
+            self.current_level_index = LEVEL_ORDER.index(level_name)
+            # Randomly select variation (unless a specific one is requested)
             variations = LEVELS[level_name]
-            self.current_variation = random.randint(0, len(variations) - 1)
+            if variation is None:
+                variation = self.rng.randint(0, len(variations) - 1)
+            self.current_variation = variation
             map_lines = variations[self.current_variation]
         
         self.original_map = [row[:] for row in map_lines]
@@ -75,13 +123,14 @@ class GameEngine:
         self._load_from_map()
 
         # AI controller
-        self.controller = HybridController()
+        self.set_controller(controller)
 
         # Game state
         self.running = True
         self.game_over = False
         self.win = False
         self.step_time = 0
+        self.steps = 0
 
 
     # ----------------------------------------------------------
@@ -105,7 +154,8 @@ class GameEngine:
         
         if current_score > current_high:
             self.highscores[self.current_level_name] = current_score
-            save_highscore_for_level(self.current_level_name, current_score)
+            if not self.headless:
+                save_highscore_for_level(self.current_level_name, current_score)
 
     def load_next_level(self):
         """Load the next level in progression"""
@@ -118,7 +168,7 @@ class GameEngine:
         
         self.current_level_name = LEVEL_ORDER[self.current_level_index]
         variations = LEVELS[self.current_level_name]
-        self.current_variation = random.randint(0, len(variations) - 1)
+        self.current_variation = self.rng.randint(0, len(variations) - 1)
         map_lines = variations[self.current_variation]
         
         # Reset game with new map
@@ -139,7 +189,7 @@ class GameEngine:
             self.current_level_name = LEVEL_ORDER[level_index]
         
         variations = LEVELS[self.current_level_name]
-        self.current_variation = random.randint(0, len(variations) - 1)
+        self.current_variation = self.rng.randint(0, len(variations) - 1)
         map_lines = variations[self.current_variation]
         self.original_map = [row[:] for row in map_lines]
         
@@ -188,6 +238,23 @@ class GameEngine:
             gx, gy = self.maze.tile_center(g.tx, g.ty, self.tile_size)
             g.set_pixel_pos(gx, gy)
 
+        # All-pairs shortest paths: built on first use (see paths)
+        self._paths = None
+
+        # Nearest-pellet distances, repaired incrementally as pellets are eaten
+        self.pellet_field = PelletDistanceField(self.maze, self.pellets | self.power_pellets)
+
+        # Board hash, updated incrementally by update() (decision caches key on it)
+        self.zobrist_table = get_zobrist_table(self.maze.width, self.maze.height)
+        self.zobrist = self.zobrist_table.board_hash(self)
+
+        # Ghost arrival times, rebuilt lazily when threatening ghosts move
+        self._threat_field = None
+        self._threat_key = None
+        # Distances from Pac-Man, rebuilt lazily for vulnerable ghosts
+        self._flee_field = None
+        self._flee_key = None
+
 
 
     # ----------------------------------------------------------
@@ -207,10 +274,16 @@ class GameEngine:
 
         self._load_from_map()
 
+        # Controller caches / plans describe the previous episode
+        reset_controller = getattr(self.controller, "reset", None)
+        if reset_controller is not None:
+            reset_controller()
+
         self.running = True
         self.game_over = False
         self.win = False
         self.step_time = 0
+        self.steps = 0
         
         # Reset speeds to default
         if self.pacman:
@@ -241,42 +314,54 @@ class GameEngine:
 
 
     # ----------------------------------------------------------
-    def update(self, dt):
+    # Headless fixed-timestep stepping
+    # ----------------------------------------------------------
+    def step(self, action=None):
+        """
+        Advance the game by exactly one fixed tick (no display needed).
+        action: optional (dx, dy) that overrides the autopilot for this tick.
+        Returns (reward, done, info) where reward is the score gained.
+        """
         if self.game_over:
-            return
+            return 0, True, self.get_step_info()
 
-        self.step_time += dt
+        score_before = self.pacman.score
+        self.update(self.fixed_dt, action)
+        self.steps += 1
 
-        # ------------------------------------------------------
-        # WIN condition → save highscore
-        # ------------------------------------------------------
-        if not self.pellets and not self.power_pellets:
-            self.win = True
-            self.running = False
-            self.game_over = True
-            self.save_current_highscore()
-            return
+        reward = self.pacman.score - score_before
+        return reward, self.game_over, self.get_step_info()
 
+    def get_step_info(self):
+        """Small summary of the episode, returned by step()"""
+        return {
+            "score": self.pacman.score,
+            "win": self.win,
+            "steps": self.steps,
+            "pellets_left": len(self.pellets) + len(self.power_pellets),
+            "level": self.current_level_name,
+            "variation": self.current_variation,
+        }
 
-        # ----------------- AUTOPILOT AI -----------------------
-        if self.pacman.autopilot:
-            escape = self._runaway_from_threat()
 
-            if escape:
-                self.pacman.set_intent(*escape)
-            else:
-                chase = self._nearest_vulnerable_ghost_direction()
 
-                if chase:
-                    self.pacman.set_intent(*chase)
-                else:
-                    dx, dy = self.controller.choose_action(self)
+    # ----------------------------------------------------------
+    def update(self, dt, action=None):
+        if self.game_over:
+            return
 
-                    # fallback if AI stuck
-                    if (dx, dy) == (0,0) or self.maze.is_wall(self.pacman.tx+dx, self.pacman.ty+dy):
-                        dx, dy = self._greedy_step_to_nearest_pellet()
+        self.step_time += dt
 
-                    self.pacman.set_intent(dx, dy)
+        # ----------------- AUTOPILOT AI -----------------------
+        if action is not None:
+            self.pacman.set_intent(*action)
+
+        elif self.pacman.autopilot:
+            if getattr(self.controller, "standalone", False):
+                # Controller plans everything itself (e.g. MCTS)
+                self.pacman.set_intent(*self.controller.choose_action(self))
+            else:
+                self._layered_autopilot()
 
 
         # ------------------------------------------------------
@@ -292,8 +377,13 @@ class GameEngine:
             nx = self.pacman.tx + dx
             ny = self.pacman.ty + dy
 
-            if not self.maze.is_wall(nx, ny):
+            # Open-direction bitmask of the tile instead of a wall probe;
+            # standing still (0, 0) still counts as a move (it animates)
+            open_dirs = self.maze.move_mask[self.pacman.ty * self.maze.width + self.pacman.tx]
+            if (dx, dy) == (0, 0) or open_dirs & MOVE_BITS.get((dx, dy), 0):
+                self.zobrist ^= self.zobrist_table.pacman_key(self.pacman)
                 self.pacman.set_tile(nx, ny)
+                self.zobrist ^= self.zobrist_table.pacman_key(self.pacman)
                 px, py = self.maze.tile_center(nx, ny, self.tile_size)
                 self.pacman.set_pixel_pos(px, py)
 
@@ -308,28 +398,52 @@ class GameEngine:
         # PELLET CONSUMPTION
         # ------------------------------------------------------
         pos = (self.pacman.tx, self.pacman.ty)
+        zt = self.zobrist_table
+        tile = pos[1] * zt.width + pos[0]
 
         if pos in self.pellets:
             self.pellets.remove(pos)
+            self.pellet_field.remove(pos)
+            self.zobrist ^= zt.pellet[tile]
             self.pacman.score += 10
 
         if pos in self.power_pellets:
             self.power_pellets.remove(pos)
+            self.pellet_field.remove(pos)
+            self.zobrist ^= zt.power[tile]
             self.pacman.score += 25
             self.pacman.move_delay = self.pacman.boost_move_delay
 
-            for g in self.ghosts:
+            for i, g in enumerate(self.ghosts):
+                self.zobrist ^= zt.ghost_key(i, g)
                 g.state = "vulnerable"
                 g.vulnerable_timer = 5
                 g.move_delay = g.vulnerable_move_delay  # SLOW DOWN GHOST
+                self.zobrist ^= zt.ghost_key(i, g)
+
+
+
+        # ------------------------------------------------------
+        # WIN condition → save highscore
+        # (right after consumption, so the last pellet's reward and
+        # done=True come out of the same step())
+        # ------------------------------------------------------
+        if not self.pellets and not self.power_pellets:
+            self.win = True
+            self.running = False
+            self.game_over = True
+            self.save_current_highscore()
+            return
 
 
 
         # ------------------------------------------------------
         # GHOST MOVEMENT
         # ------------------------------------------------------
-        for g in self.ghosts:
+        flee = None   # shared by this tick's vulnerable ghosts
+        for i, g in enumerate(self.ghosts):
             g.prev_tx, g.prev_ty = g.tx, g.ty
+            key = zt.ghost_key(i, g)
 
             g.time_since_move += dt
 
@@ -339,22 +453,26 @@ class GameEngine:
                     g.state = "normal"
                     g.move_delay = g.normal_move_delay  # RESET SPEED
 
-            if all(gg.state == "normal" for gg in self.ghosts):
-                    self.pacman.move_delay = self.pacman.normal_move_delay
-
             if g.time_since_move < g.move_delay:
+                self.zobrist ^= key ^ zt.ghost_key(i, g)
                 continue
 
             g.time_since_move = 0
 
-            dxg, dyg = g.choose_move(self.maze, pos)
+            if g.state == "vulnerable" and flee is None:
+                flee = self.flee_field().dist
+            # choose_move only returns open directions (from the maze's move tables)
+            dxg, dyg = g.choose_move(self.maze, pos, self.rng, flee)
 
             ngx, ngy = g.tx + dxg, g.ty + dyg
-            if not self.maze.is_wall(ngx, ngy):
-                g.set_tile(ngx, ngy)
-                gx, gy = self.maze.tile_center(ngx, ngy, self.tile_size)
-                g.set_pixel_pos(gx, gy)
+            g.set_tile(ngx, ngy)
+            gx, gy = self.maze.tile_center(ngx, ngy, self.tile_size)
+            g.set_pixel_pos(gx, gy)
+            self.zobrist ^= key ^ zt.ghost_key(i, g)
 
+        # Once per tick, not per ghost: timers only ever expire in the loop above
+        if all(g.state == "normal" for g in self.ghosts):
+            self.pacman.move_delay = self.pacman.normal_move_delay
 
 
         # ------------------------------------------------------
@@ -380,11 +498,14 @@ class GameEngine:
         if g.state == "vulnerable":
             self.pacman.score += 50
 
+            i = self.ghosts.index(g)
+            self.zobrist ^= self.zobrist_table.ghost_key(i, g)
             g.set_tile(1, 1)
             g.set_pixel_pos(*self.maze.tile_center(1, 1, self.tile_size))
             g.state = "normal"
             g.move_delay = g.normal_move_delay  # RESET SPEED when eaten
             g.vulnerable_timer = 0
+            self.zobrist ^= self.zobrist_table.ghost_key(i, g)
             
             if all(gg.state == "normal" for gg in self.ghosts):
                 self.pacman.move_delay = self.pacman.normal_move_delay
@@ -413,91 +534,265 @@ class GameEngine:
 
 
     # ----------------------------------------------------------
-    # AI HELPERS
+    # SNAPSHOT / RESTORE (for search and replays)
     # ----------------------------------------------------------
-    def _runaway_from_threat(self, danger_radius=2):
-        threats = [(g.tx, g.ty) for g in self.ghosts if g.state == "normal"]
-        if not threats:
-            return None
+    def snapshot(self):
+        """Capture the full mutable game state as an EngineSnapshot"""
+        return EngineSnapshot(
+            self.maze, self._paths, self.original_map,
+            (self.current_level_index, self.current_level_name,
+             self.current_variation, self.all_levels_complete),
+            self.pacman.get_state(),
+            tuple(g.get_state() for g in self.ghosts),
+            frozenset(self.pellets),
+            frozenset(self.power_pellets),
+            self.pellet_field.get_state(),
+            (self.running, self.game_over, self.win, self.step_time, self.steps),
+            self.rng.getstate(),
+            self.ai_rng.getstate(),
+            self.zobrist,
+        )
+
+    def restore(self, snap):
+        """Put the engine back into the state captured by snapshot()"""
+        if snap.paths is not None or snap.maze is not self.maze:
+            # (keep a table built since the snapshot if the maze is the same)
+            self._paths = snap.paths
+        self.maze = snap.maze
+        self.tile_size = TILE_SIZE
+        self.width_px = self.maze.width * TILE_SIZE
+        self.height_px = self.maze.height * TILE_SIZE
+        self.original_map = snap.original_map
+        (self.current_level_index, self.current_level_name,
+         self.current_variation, self.all_levels_complete) = snap.level
+
+        self.pacman.set_state(snap.pacman)
+        while len(self.ghosts) < len(snap.ghosts):
+            self.ghosts.append(Ghost(0, 0))
+        del self.ghosts[len(snap.ghosts):]
+        for g, state in zip(self.ghosts, snap.ghosts):
+            g.set_state(state)
+
+        self.pellets = set(snap.pellets)
+        self.power_pellets = set(snap.power_pellets)
+        if self.pellet_field.maze is not self.maze:
+            # snapshot from another maze: rebuild the field shell first
+            self.pellet_field = PelletDistanceField(self.maze, ())
+        self.pellet_field.set_state(snap.pellet_field)
+
+        self.running, self.game_over, self.win, self.step_time, self.steps = snap.flags
+        self.rng.setstate(snap.rng)
+        self.ai_rng.setstate(snap.ai_rng)
+        self.zobrist_table = get_zobrist_table(self.maze.width, self.maze.height)
+        self.zobrist = snap.zobrist
+
+        # Cached decisions may be from a later point of the run
+        reset_controller = getattr(self.controller, "reset", None)
+        if reset_controller is not None:
+            reset_controller()
+
+    def push_snapshot(self):
+        """Save the current state on the undo stack"""
+        self.undo_stack.append(self.snapshot())
+
+    def undo(self):
+        """Restore the most recently pushed state; False if the stack is empty"""
+        if not self.undo_stack:
+            return False
+        self.restore(self.undo_stack.pop())
+        return True
 
-        px, py = self.pacman.tx, self.pacman.ty
+    def clone(self, controller=None):
+        """
+        Independent engine in the same state (maze tables are shared). The
+        clone gets its own highscore table and `controller` (a name from
+        CONTROLLERS or an instance); by default the controller's copy(),
+        which keeps its settings and loaded weights but no cached
+        decisions, or the same controller if it has no copy().
+        """
+        other = GameEngine.__new__(GameEngine)
+        other.__dict__.update(self.__dict__)
+        other.highscores = dict(self.highscores)
+        if controller is None:
+            copy_controller = getattr(self.controller, "copy", None)
+            controller = copy_controller() if copy_controller is not None else self.controller
+        other.set_controller(controller)
+        other.pacman = self.pacman.copy()
+        other.ghosts = [g.copy() for g in self.ghosts]
+        other.pellets = set(self.pellets)
+        other.power_pellets = set(self.power_pellets)
+        other.pellet_field = self.pellet_field.copy()
+        other.rng = self.rng.copy()
+        other.ai_rng = self.ai_rng.copy()
+        other.undo_stack = []
+        return other
 
-        close = [(gx, gy) for gx, gy in threats
-                 if abs(gx - px) + abs(gy - py) <= danger_radius]
 
-        if not close:
+
+    # ----------------------------------------------------------
+    # AI HELPERS
+    # ----------------------------------------------------------
+    def set_controller(self, controller):
+        """Select the autopilot controller by name (see CONTROLLERS) or instance"""
+        if isinstance(controller, str):
+            controller = CONTROLLERS[controller]()
+        self.controller = controller
+
+    @property
+    def paths(self):
+        """
+        PathTable of the current layout (all-pairs shortest paths, shared by
+        every maze with these walls). Built on first access, so runs whose
+        controller never asks for maze distances skip the O(n^2) tables.
+        """
+        if self._paths is None:
+            self._paths = get_path_table(self.maze)
+        return self._paths
+
+    def threat_field(self):
+        """
+        GhostThreatField of the normal-state ghosts. Built at most once per
+        tick, and only when one of them moved or changed state since the last
+        build; runaway, danger checks and the controller all share it.
+        """
+        key = (self.paths, tuple((g.tx, g.ty) for g in self.ghosts if g.state == "normal"))
+        if key != self._threat_key:
+            self._threat_field = GhostThreatField(self.paths, key[1])
+            self._threat_key = key
+        return self._threat_field
+
+    def flee_field(self):
+        """
+        FleeField from Pac-Man's tile, for vulnerable ghosts. Built at most
+        once per tick, and only when a vulnerable ghost moves after Pac-Man
+        changed tile; every ghost shares it.
+        """
+        key = (self.paths, self.pacman.tx, self.pacman.ty)
+        if key != self._flee_key:
+            self._flee_field = FleeField(self.paths, key[1:])
+            self._flee_key = key
+        return self._flee_field
+
+    def _layered_autopilot(self):
+        """Threat avoidance > vulnerable-ghost chase > controller / greedy pellet"""
+        self.pacman.set_intent(*self._layered_action())
+
+    def _layered_action(self, controller=None):
+        """The layered autopilot's move; controller defaults to self.controller"""
+        controller = controller or self.controller
+
+        # The layers only depend on the board, so a controller may serve
+        # repeated boards from a cache keyed by the Zobrist hash
+        cached = getattr(controller, "cached_decision", None)
+        if cached is None:
+            moves, randomize = self._layered_options(controller)
+        else:
+            moves, randomize = cached(self, lambda: self._layered_options(controller))
+
+        # ties are broken here, so cached and fresh decisions draw the same randomness
+        return self.ai_rng.choice(moves) if randomize else moves[0]
+
+    def _layered_options(self, controller=None):
+        """
+        (moves, randomize): the layered autopilot's equally good moves, and
+        whether to pick one at random (else moves[0] is the decision)
+        """
+        escape = self._runaway_options()
+        if escape:
+            return escape, True
+
+        chase = self._vulnerable_chase_options()
+        if chase:
+            return chase, True
+
+        dx, dy = (controller or self.controller).choose_action(self)
+
+        # fallback if AI stuck
+        open_dirs = self.maze.move_mask[self.pacman.ty * self.maze.width + self.pacman.tx]
+        if (dx, dy) == (0,0) or not open_dirs & MOVE_BITS.get((dx, dy), 0):
+            return self._greedy_pellet_options()
+
+        return ((dx, dy),), False
+
+    def _runaway_from_threat(self, danger_radius=2):
+        best_dirs = self._runaway_options(danger_radius)
+        return self.ai_rng.choice(best_dirs) if best_dirs else None
+
+    def _runaway_options(self, danger_radius=2):
+        # Maze distance: ghosts behind a wall are not a threat
+        start = (self.pacman.tx, self.pacman.ty)
+        field = self.threat_field()
+        if field.distance(start) > danger_radius:
             return None
 
         best_dirs = []
         best_dist = -1
 
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            nx, ny = px + dx, py + dy
-            if self.maze.is_wall(nx, ny):
-                continue
-
-            min_d = min(abs(gx - nx) + abs(gy - ny) for gx, gy in close)
+        for move, tile in self._open_moves(start):
+            d = field.distance(tile)
 
-            if min_d > best_dist:
-                best_dist = min_d
-                best_dirs = [(dx, dy)]
-            elif min_d == best_dist:
-                best_dirs.append((dx, dy))
+            if d > best_dist:
+                best_dist = d
+                best_dirs = [move]
+            elif d == best_dist:
+                best_dirs.append(move)
 
-        return random.choice(best_dirs) if best_dirs else None
+        return best_dirs
 
 
 
     def _nearest_vulnerable_ghost_direction(self):
+        best = self._vulnerable_chase_options()
+        return self.ai_rng.choice(best) if best else None
+
+    def _vulnerable_chase_options(self):
         vuln = [(g.tx, g.ty) for g in self.ghosts if g.state == "vulnerable"]
         if not vuln:
             return None
 
-        dist = self.maze.bfs_distance_grid(vuln)
         start = (self.pacman.tx, self.pacman.ty)
-
-        if start not in dist:
+        if start not in self.paths.index:
             return None
 
-        curr = dist[start]
+        moves = self._open_moves(start)
+        dist = self.paths.nearest_distances([start] + [m[1] for m in moves], vuln)
 
-        best = []
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            nx, ny = start[0]+dx, start[1]+dy
-            if not self.maze.is_wall(nx, ny) and (nx, ny) in dist:
-                if dist[(nx, ny)] < curr:
-                    best.append((dx, dy))
+        curr = dist[0]
+        if curr == UNREACHABLE:
+            return None
 
-        return random.choice(best) if best else None
+        return [move for (move, _), d in zip(moves, dist[1:]) if d < curr]
 
 
 
     def _greedy_step_to_nearest_pellet(self):
-        targets = list(self.pellets | self.power_pellets)
-        if not targets:
-            for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-                nx, ny = self.pacman.tx + dx, self.pacman.ty + dy
-                if not self.maze.is_wall(nx, ny):
-                    return (dx, dy)
-            return (0, 0)
-
-        dist = self.maze.bfs_distance_grid(targets)
+        moves, randomize = self._greedy_pellet_options()
+        return self.ai_rng.choice(moves) if randomize else moves[0]
+
+    def _greedy_pellet_options(self):
+        """(moves, randomize) as in _layered_options"""
+        if not self.pellets and not self.power_pellets:
+            moves = self._open_moves((self.pacman.tx, self.pacman.ty))
+            return ((moves[0][0] if moves else (0, 0)),), False
+
         start = (self.pacman.tx, self.pacman.ty)
+        if self.maze.is_wall(*start):
+            return ((0, 0),), False
 
-        if start not in dist:
-            return (0,0)
+        w = self.maze.width
+        dist = self.pellet_field.dist
+        curr = dist[start[1] * w + start[0]]
+        if curr == INF:
+            return ((0, 0),), False
 
-        curr = dist[start]
         candidates = []
-
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            nx, ny = start[0]+dx, start[1]+dy
-            if self.maze.is_wall(nx, ny): continue
-            if (nx, ny) in dist:
-                candidates.append(((dx, dy), dist[(nx, ny)], (nx, ny)))
+        for move, tile in self._open_moves(start):
+            d = dist[tile[1] * w + tile[0]]
+            if d != INF:
+                candidates.append((move, d, tile))
 
         if not candidates:
-            return (0,0)
+            return ((0, 0),), False
 
         better = [c for c in candidates if c[1] < curr]
         pick = better if better else candidates
@@ -507,14 +802,15 @@ class GameEngine:
             pick = safe
 
         pick.sort(key=lambda x: x[1])
-        best = [c for c in pick if c[1] == pick[0][1]]
+        return [c[0] for c in pick if c[1] == pick[0][1]], True
 
-        return random.choice(best)[0]
+
+    def _open_moves(self, start):
+        """[((dx, dy), (nx, ny))] for every non-wall neighbour of start"""
+        x, y = start
+        return [((dx, dy), (x+dx, y+dy))
+                for dx, dy in MASK_MOVES[self.maze.move_mask[y * self.maze.width + x]]]
 
 
     def _is_tile_dangerous(self, tx, ty, danger_radius=2):
-        for g in self.ghosts:
-            if g.state == "normal":
-                if abs(g.tx - tx) + abs(g.ty - ty) <= danger_radius:
-                    return True
-        return False
+        return self.threat_field().distance((tx, ty)) <= danger_radius
@@ -1,4 +1,5 @@
 import os
+from array import array
 from collections import deque
 
 # Tile constants
@@ -20,6 +21,33 @@ DEFAULT_MAP = [
 ]
 
 
+# 4-connected directions, in the order neighbors() yields them
+NEIGHBOR_DIRS = [(0,-1),(1,0),(0,1),(-1,0)]
+
+# Move bitmasks: bit k set = MOVE_DIRS[k] is open (the engine's scan order)
+MOVE_DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+MOVE_BITS = {d: 1 << k for k, d in enumerate(MOVE_DIRS)}
+# mask -> tuple of open directions, in MOVE_DIRS order
+MASK_MOVES = tuple(
+    tuple(d for k, d in enumerate(MOVE_DIRS) if mask >> k & 1)
+    for mask in range(16)
+)
+# heading = MOVE_DIRS index of the last move, NO_HEADING before the first
+MOVE_HEADING = {d: k for k, d in enumerate(MOVE_DIRS)}
+NO_HEADING = 4
+
+def _turns(mask, heading):
+    """Open directions minus the reversal of heading, unless that's the only exit"""
+    if heading == NO_HEADING:
+        return MASK_MOVES[mask]
+    dx, dy = MOVE_DIRS[heading]
+    reverse = MOVE_BITS[(-dx, -dy)]
+    return MASK_MOVES[mask & ~reverse if mask != reverse else mask]
+
+# Only depends on the bitmask; mazes map their tiles through it
+TURN_MOVES = tuple(_turns(mask, h) for mask in range(16) for h in range(5))
+
+
 class Maze:
     def __init__(self, map_lines=None):
         # map_lines: list of strings; each char represents tile
@@ -33,10 +61,59 @@ class Maze:
             if len(row) < self.width:
                 row += [' '] * (self.width - len(row))
 
+        self._build_arrays()
+
+    def _build_arrays(self):
+        """
+        Compact backend. Walls never change after construction, so walkability
+        and adjacency are computed once:
+          walkable   : bytearray, 1 per open tile, flat index = y * width + x
+          adj_start  : CSR row offsets, neighbours of tile i are
+          adj        :   adj[adj_start[i]:adj_start[i+1]] (flat indices)
+          move_mask  : bytearray, open directions of tile i as MOVE_BITS
+          turn_moves : open directions of tile i minus the reversal of
+                       heading h (kept if it's the only exit), at i * 5 + h
+        """
+        w, h = self.width, self.height
+        self.size = w * h
+
+        self.walkable = bytearray(
+            0 if ch == '%' or ch == '#' else 1
+            for row in self.raw for ch in row
+        )
+
+        walkable = self.walkable
+        self.adj_start = array('i', [0])
+        self.adj = array('i')
+        self.move_mask = bytearray(self.size)
+        for ty in range(h):
+            for tx in range(w):
+                mask = 0
+                for dx, dy in NEIGHBOR_DIRS:
+                    x, y = tx + dx, ty + dy
+                    if 0 <= x < w and 0 <= y < h and walkable[y * w + x]:
+                        self.adj.append(y * w + x)
+                        mask |= MOVE_BITS[(dx, dy)]
+                self.move_mask[ty * w + tx] = mask
+                self.adj_start.append(len(self.adj))
+
+        turns = TURN_MOVES
+        self.turn_moves = [turns[k] for mask in self.move_mask for k in range(mask * 5, mask * 5 + 5)]
+
+    def index(self, tx, ty):
+        """Flat tile index of (tx, ty)"""
+        return ty * self.width + tx
+
+    def tile_of(self, idx):
+        """(tx, ty) of a flat tile index"""
+        ty, tx = divmod(idx, self.width)
+        return (tx, ty)
+
     def is_wall(self, tx, ty):
-        if tx < 0 or tx >= self.width or ty < 0 or ty >= self.height:
-            return True
-        return self.raw[ty][tx] == '%' or self.raw[ty][tx] == '#'
+        w = self.width
+        if 0 <= tx < w and 0 <= ty < self.height:
+            return not self.walkable[ty * w + tx]
+        return True
 
     def get_tile(self, tx, ty):
         if tx < 0 or tx >= self.width or ty < 0 or ty >= self.height:
@@ -52,25 +129,42 @@ class Maze:
         return out
 
     def neighbors(self, tx, ty):
-        # 4-connected neighbors (no diagonals)
-        dirs = [(0,-1),(1,0),(0,1),(-1,0)]
-        for dx,dy in dirs:
-            nx, ny = tx+dx, ty+dy
-            if 0 <= nx < self.width and 0 <= ny < self.height and not self.is_wall(nx, ny):
-                yield (nx, ny)
+        # 4-connected neighbors (no diagonals), read off the adjacency CSR
+        w = self.width
+        if 0 <= tx < w and 0 <= ty < self.height:
+            i = ty * w + tx
+            return tuple((v % w, v // w) for v in self.adj[self.adj_start[i]:self.adj_start[i+1]])
+        return tuple(
+            (tx+dx, ty+dy) for dx, dy in NEIGHBOR_DIRS
+            if not self.is_wall(tx+dx, ty+dy)
+        )
 
-    def bfs_distance_grid(self, starts):
-        # returns dist dict from any start to all reachable tiles
-        dist = {p:0 for p in starts}
-        q = deque(starts)
+    def bfs_distances(self, start_indices):
+        """Multi-source BFS over flat indices; returns a list (-1 = unreached)"""
+        dist = [-1] * self.size
+        adj, adj_start = self.adj, self.adj_start
+        q = deque()
+        for i in start_indices:
+            if dist[i] < 0:
+                dist[i] = 0
+                q.append(i)
         while q:
-            x,y = q.popleft()
-            for nx,ny in self.neighbors(x,y):
-                if (nx,ny) not in dist:
-                    dist[(nx,ny)] = dist[(x,y)] + 1
-                    q.append((nx,ny))
+            u = q.popleft()
+            d = dist[u] + 1
+            for k in range(adj_start[u], adj_start[u+1]):
+                v = adj[k]
+                if dist[v] < 0:
+                    dist[v] = d
+                    q.append(v)
         return dist
 
+    def bfs_distance_grid(self, starts):
+        # returns dist dict from any start to all reachable tiles
+        # (off-grid starts are ignored)
+        w, h = self.width, self.height
+        flat = self.bfs_distances([y * w + x for x, y in starts if 0 <= x < w and 0 <= y < h])
+        return {(i % w, i // w): d for i, d in enumerate(flat) if d >= 0}
+
     def tile_center(self, tx, ty, tile_size):
         # pixel center of tile (tx,ty)
         return (tx * tile_size + tile_size // 2, ty * tile_size + tile_size // 2)
@@ -0,0 +1,115 @@
+# environment/path_table.py
+# Precomputed all-pairs shortest paths over the walkable tiles of a maze
+
+import hashlib
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+UNREACHABLE = np.iinfo(np.uint16).max
+NO_HOP = np.iinfo(np.uint16).max
+
+
+# Tables are keyed by wall layout and shared by every engine / reset / level
+MAX_CACHED_LAYOUTS = 32
+_TABLE_CACHE = OrderedDict()
+
+
+def layout_key(maze):
+    """Hash of the wall layout only (pellets and spawns don't affect paths)"""
+    header = f"{maze.width}x{maze.height}:".encode()
+    return hashlib.sha1(header + bytes(maze.walkable)).hexdigest()
+
+
+def get_path_table(maze):
+    """Return the cached PathTable for this maze's layout, building it once"""
+    key = layout_key(maze)
+    table = _TABLE_CACHE.get(key)
+    if table is None:
+        table = PathTable(maze)
+        _TABLE_CACHE[key] = table
+        if len(_TABLE_CACHE) > MAX_CACHED_LAYOUTS:
+            _TABLE_CACHE.popitem(last=False)
+    else:
+        _TABLE_CACHE.move_to_end(key)
+    return table
+
+
+class PathTable:
+    """
+    Distance and next-hop matrices between every pair of walkable tiles.
+
+    dist[i, j]     : BFS distance from node i to node j (UNREACHABLE if none)
+    next_hop[i, j] : neighbour node of i on a shortest path to j
+
+    Both are uint16 n x n matrices, so memory is 4 * n^2 bytes for n walkable
+    tiles (~73 KB for the largest pro maze, n = 135).
+    """
+
+    def __init__(self, maze):
+        self.width = maze.width
+        self.height = maze.height
+
+        self.nodes = [maze.tile_of(i) for i in range(maze.size) if maze.walkable[i]]
+        self.index = {pos: i for i, pos in enumerate(self.nodes)}
+        # maze flat index (y * width + x) of every node
+        self.flat = np.array([y * maze.width + x for x, y in self.nodes], dtype=np.int64)
+        n = len(self.nodes)
+
+        # Maze's precomputed neighbour table, renumbered to walkable nodes
+        self.adjacency = [
+            [self.index[pos] for pos in maze.neighbors(x, y)]
+            for x, y in self.nodes
+        ]
+
+        self.dist = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+        self.next_hop = np.full((n, n), NO_HOP, dtype=np.uint16)
+        for source in range(n):
+            self._bfs_from(source)
+
+    def _bfs_from(self, source):
+        n = len(self.nodes)
+        dist = [-1] * n
+        first = [source] * n   # first step taken from source towards each node
+        dist[source] = 0
+
+        q = deque([source])
+        while q:
+            u = q.popleft()
+            for v in self.adjacency[u]:
+                if dist[v] < 0:
+                    dist[v] = dist[u] + 1
+                    first[v] = v if u == source else first[u]
+                    q.append(v)
+
+        reached = [i for i in range(n) if dist[i] >= 0]
+        self.dist[source, reached] = [dist[i] for i in reached]
+        self.next_hop[source, reached] = [first[i] for i in reached]
+
+    # ----------------------------------------------------------
+    def distance(self, a, b):
+        """Maze distance between tiles a and b (None if unreachable / wall)"""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None or self.dist[i, j] == UNREACHABLE:
+            return None
+        return int(self.dist[i, j])
+
+    def next_step(self, a, b):
+        """(dx, dy) of the first move on a shortest path from a to b"""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None or i == j or self.next_hop[i, j] == NO_HOP:
+            return None
+        nx, ny = self.nodes[self.next_hop[i, j]]
+        return (nx - a[0], ny - a[1])
+
+    def nearest_distances(self, tiles, targets):
+        """
+        For each tile, distance to the closest of `targets`
+        (UNREACHABLE where no target can be reached). Returns a uint16 array.
+        """
+        rows = [self.index[t] for t in tiles]
+        cols = [self.index[t] for t in targets if t in self.index]
+        if not cols:
+            return np.full(len(rows), UNREACHABLE, dtype=np.uint16)
+        return self.dist[np.ix_(rows, cols)].min(axis=1)
@@ -2,7 +2,12 @@ import pygame
 from pygame import Rect
 from .game_engine import TILE_SIZE
 from .maze import WALL
+from .path_table import layout_key
+from .sprite_atlas import get_sprite_atlas
 import math
+from collections import OrderedDict
+
+import numpy as np
 
 # color palette
 BLACK = (0,0,0)
@@ -15,213 +20,135 @@ GHOST_COLOR = (200, 50, 50)
 GRID_COLOR = (60,60,60)
 
 FONT_SIZE = 18
+TEXT_CACHE_SIZE = 64   # rendered strings kept per Renderer
+
+_FONTS = {}
+
+
+def get_font(size, bold=False):
+    """SysFont lookups are slow; share one Font per (size, bold)"""
+    if not pygame.font.get_init():
+        # fonts die with pygame.font.quit()
+        _FONTS.clear()
+        pygame.font.init()
+    key = (size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = _FONTS[key] = pygame.font.SysFont("Arial", size, bold=bold)
+    return font
 
 class Renderer:
-    def __init__(self, engine):
+    HUD_HEIGHT = 40
+
+    def __init__(self, engine, time_source=None):
+        """
+        time_source: callable returning milliseconds for the animations
+        (mouth, pulsing pellets, ghost flashing); defaults to the wall clock,
+        pass a simulated clock when rendering offscreen after the fact.
+        """
         self.engine = engine
+        self.time_source = time_source or pygame.time.get_ticks
         self.tile_size = engine.tile_size
         self.width = engine.width_px
-        self.hud_height = 40
+        self.hud_height = self.HUD_HEIGHT
         self.height = engine.height_px + self.hud_height
 
         # font
         pygame.font.init()
-        self.font = pygame.font.SysFont("Arial", FONT_SIZE)
+        self.font = get_font(FONT_SIZE)
+        self._text_cache = OrderedDict()
         self.mouth_open = True
         self.last_mouth_toggle = 0
         self.mouth_interval = 150   # ms (controls animation speed)
 
-
-    def render(self, screen):
+        # cached layers + dirty-rect bookkeeping
+        self._wall_layer = None
+        self._wall_key = None
+        self._background = None
+        self._maze = None
+        self._screen = None
+        self._pellets = None
+        self._pellet_grid = None
+        self._drawn_pellets = set()
+        self._stamp = None
+        self._prev_rects = []
+        self._hud_key = None
+        self._full_redraw = True
+        self._sprites = None
+        self._prev_positions = []
+        self._move_from = []
+        self._gameover_key = None
+        self._gameover_surface = None
+        self._gameover_pos = (0, 0)
+        self._gameover_shown = None
+
+    def render(self, screen, alpha=1.0):
+        """
+        Draw one frame and return the list of screen rects that changed
+        (pass it to pygame.display.update).
+        alpha: fraction of a simulation tick elapsed since the last update;
+        entities slide from their previous tile to their current one over
+        their move delay (see _draw_pos).
+        """
         if not self.engine.running and self.engine.game_over:
-            # Dynamically size Game Over screen (90% of current window)
-            GAMEOVER_WIDTH = int(self.width * 0.9)
-            GAMEOVER_HEIGHT = int(self.height * 0.9)
-            
-            # Create surface
-            gameover_screen = pygame.Surface((GAMEOVER_WIDTH, GAMEOVER_HEIGHT))
-            gameover_screen.fill(BLACK)
-            
-            # Base for scaling fonts
-            base = min(GAMEOVER_WIDTH, GAMEOVER_HEIGHT)
-            msg_font = pygame.font.SysFont("Arial", max(20, base // 16), bold=True)
-            score_font = pygame.font.SysFont("Arial", max(16, base // 22))
-            level_font = pygame.font.SysFont("Arial", max(14, base // 28))
-            hint_font = pygame.font.SysFont("Arial", max(12, base // 38))
-
-            # Check message
-            if getattr(self.engine, 'all_levels_complete', False):
-                msg = "ALL LEVELS COMPLETE!"
-                msg_color = (255, 215, 0)
-            else:
-                msg = "LEVEL COMPLETE!" if self.engine.win else "GAME OVER"
-                msg_color = (0, 255, 0) if self.engine.win else (255, 50, 50)
-
-            # Render text
-            surf = msg_font.render(msg, True, msg_color)
-            level_display = self.engine.current_level_name.upper()
-            level_surf = level_font.render(f"Level: {level_display}", True, (200, 200, 200))
-            score_surf = score_font.render(f"Score: {self.engine.pacman.score}", True, WHITE)
-            highscore_surf = level_font.render(f"High Score: {self.engine.get_current_highscore()}", True, (255, 215, 0))
-
-            # Hint
-            if self.engine.win and not getattr(self.engine, 'all_levels_complete', False):
-                hint_surf = hint_font.render("Press ENTER for next level | SPACE to restart", True, (200, 200, 50))
-            else:
-                hint_surf = hint_font.render("Press SPACE to restart", True, (200, 200, 50))
-
-            # Proportional y-spacing
-            y_pos = GAMEOVER_HEIGHT * 0.1
-            spacing = GAMEOVER_HEIGHT * 0.12
-
-            for surf_item in [surf, level_surf, score_surf, highscore_surf, hint_surf]:
-                gameover_screen.blit(surf_item, (GAMEOVER_WIDTH//2 - surf_item.get_width()//2, int(y_pos)))
-                y_pos += spacing
-
-            # Blit centered
-            x_offset = (self.width - GAMEOVER_WIDTH) // 2
-            y_offset = (self.height - GAMEOVER_HEIGHT) // 2
-            screen.fill(BLACK)
-            screen.blit(gameover_screen, (x_offset, y_offset))
-            
-            return
-
+            return self._render_game_over(screen)
+        self._gameover_shown = None
+
+        maze = self.engine.maze
+        if (screen is not self._screen or maze is not self._maze
+                or self.tile_size != self.engine.tile_size):
+            self._full_redraw = True
+
+        if self._full_redraw:
+            self._rebuild_background()
+            screen.blit(self._background, (0, 0))
+            self._screen = screen
+            self._prev_rects = []
+            self._hud_key = None
+        else:
+            self._sync_pellets()
+            # erase last frame's entities / animated tiles
+            for rect in self._prev_rects:
+                screen.blit(self._background, rect, rect)
 
-        # background
-        screen.fill(BLACK)
         state = self.engine.get_state_snapshot()
-        maze = state["maze"]
-
-        # draw tiles
-        for y in range(maze.height):
-            for x in range(maze.width):
-                ch = maze.get_tile(x,y)
-                left = x * self.tile_size
-                top = y * self.tile_size
-                rect = Rect(left, top, self.tile_size, self.tile_size)
-
-
-                if maze.is_wall(x,y) :
-                    # pygame.draw.rect(screen, WALL_COLOR, rect)
-                    pygame.draw.rect(screen, WALL_COLOR, rect)
-                    # Top highlight
-                    pygame.draw.line(screen, (100,100,200), (left, top), (left+self.tile_size, top), 2)
-                    # Left shadow
-                    pygame.draw.line(screen, (10,10,50), (left, top), (left, top+self.tile_size), 2)
-
-
-                else:
-                    # 
-                    
-                    # For normal pellets
-                    if (x,y) in state["pellets"]:
-                        center = (left + self.tile_size//2, top + self.tile_size//2)
-                        radius = max(2, self.tile_size//8)
-                        pygame.draw.circle(screen, PELLET_COLOR, center, radius)
-                        # Glow effect
-                        pygame.draw.circle(screen, (255, 255, 100), center, radius//2)
-
-                    # For power pellets (pulsing)
-                    if (x,y) in state["power_pellets"]:
-                        center = (left + self.tile_size//2, top + self.tile_size//2)
-                        size = max(4, self.tile_size//5 + int(4 * math.sin(pygame.time.get_ticks()/150)))
-                        pygame.draw.circle(screen, POWER_COLOR, center, size)
-                    # Glow
-                        pygame.draw.circle(screen, (255,255,150), center, size//2)
+        dirty = []
+
+        # power pellets (pulsing, so redrawn every frame)
+        ts = self.tile_size
+        if state["power_pellets"]:
+            size = max(4, ts//5 + int(4 * math.sin(self.time_source()/150)))
+            for x, y in state["power_pellets"]:
+                center = (x * ts + ts//2, y * ts + ts//2)
+                pygame.draw.circle(screen, POWER_COLOR, center, size)
+                # Glow
+                pygame.draw.circle(screen, (255,255,150), center, size//2)
+                dirty.append(Rect(x * ts, y * ts, ts, ts))
 
         # draw Pac-Man
+        self._track_moves()
+        atlas = self._atlas()
         pm = state["pacman"]
         if pm.x is None:
             pmx, pmy = maze.tile_center(pm.tx, pm.ty, self.tile_size)
             pm.set_pixel_pos(pmx, pmy)
-
-        px, py = int(pm.x), int(pm.y)
-        radius = self.tile_size//2 - 2
+        px, py = self._draw_pos(0, pm, alpha)
 
         # Mouth animation (time-based)
-        current_time = pygame.time.get_ticks()
+        current_time = self.time_source()
         if current_time - self.last_mouth_toggle > self.mouth_interval:
             self.mouth_open = not self.mouth_open
             self.last_mouth_toggle = current_time
 
-        angle = 40 if self.mouth_open else 10
-
-        # direction → angle mapping
-        dx, dy = pm.direction
-        if (dx, dy) == (1, 0):     # RIGHT
-            start = math.radians(angle)
-            end   = math.radians(360 - angle)
-        elif (dx, dy) == (-1, 0):  # LEFT
-            start = math.radians(180 + angle)
-            end   = math.radians(180 - angle)
-        elif (dx, dy) == (0, -1):  # UP
-            start = math.radians(90 + angle)
-            end   = math.radians(90 - angle)
-        elif (dx, dy) == (0, 1):   # DOWN
-            start = math.radians(270 + angle)
-            end   = math.radians(270 - angle)
-        else:
-            # standing still → minimal mouth
-            start = math.radians(5)
-            end   = math.radians(355)
-
-#----------------------------------------------------------
-        # Define mouth_points safely
-        mouth_points = [
-            (px, py),
-            (px + radius * math.cos(start), py - radius * math.sin(start)),
-            (px + radius * math.cos(end),   py - radius * math.sin(end)),
-        ]
-#-----------------------------------------------------------------
-        # Draw Pac-Man (circle)
-        pygame.draw.circle(screen, PACMAN_COLOR, (px, py), radius)
-
-# Highlight for 3D effect
-        highlight_pos = (px - radius//3, py - radius//3)
-        pygame.draw.circle(screen, (255,255,150), highlight_pos, radius//3)
-
-# Draw mouth using arc for smooth cut
-        if self.mouth_open:
-    # Map direction to angle
-            if (dx, dy) == (1, 0):     # RIGHT
-                start_angle = -angle
-                end_angle = angle
-            elif (dx, dy) == (-1, 0):  # LEFT
-                start_angle = 180 - angle
-                end_angle = 180 + angle
-            elif (dx, dy) == (0, -1):  # UP
-                start_angle = 90 - angle
-                end_angle = 90 + angle
-            elif (dx, dy) == (0, 1):   # DOWN
-                start_angle = 270 - angle
-                end_angle = 270 + angle
-            else:
-                start_angle = -angle
-                end_angle = angle
-
-    # Convert to radians
-            start_rad = math.radians(start_angle)
-            end_rad = math.radians(end_angle)
-
-            mouth_rect = pygame.Rect(px - radius, py - radius, 2*radius, 2*radius)
-            pygame.draw.arc(screen, BLACK, mouth_rect, start_rad, end_rad, radius//2)
-
-
-#-----------------------------------------------------------------
-
-        # Draw the mouth cutout (triangle wedge)
-        mouth_points = [
-            (px, py),
-            (px + radius * math.cos(start), py - radius * math.sin(start)),
-            (px + radius * math.cos(end),   py - radius * math.sin(end)),
-        ]
-
-        pygame.draw.polygon(screen, BLACK, mouth_points)
+        frame = atlas.pacman(tuple(pm.direction), self.mouth_open)
+        screen.blit(frame, (px - atlas.offset, py - atlas.offset))
+        dirty.append(self._entity_rect(px, py))
 
         # draw ghosts
-        for g in state["ghosts"]:
-            gx = int(g.x) if g.x is not None else maze.tile_center(g.tx, g.ty, self.tile_size)[0]
-            gy = int(g.y) if g.y is not None else maze.tile_center(g.tx, g.ty, self.tile_size)[1]
+        for i, g in enumerate(state["ghosts"], 1):
+            if g.x is None:
+                g.set_pixel_pos(*maze.tile_center(g.tx, g.ty, self.tile_size))
+            gx, gy = self._draw_pos(i, g, alpha)
 
             # ghost color
             if g.state == "normal":
@@ -229,39 +156,268 @@ class Renderer:
             else:
                 # Vulnerable: flash blue when timer < 2 sec
                 if g.vulnerable_timer < 2:
-                    c = (50, 200, 200) if (pygame.time.get_ticks() // 250) % 2 == 0 else (255,255,255)
+                    c = (50, 200, 200) if (self.time_source() // 250) % 2 == 0 else (255,255,255)
                 else:
                     c = (50, 200, 200)
 
-    # scale factor (70% of tile size)
-            scale = 0.7
-            body_width = int((self.tile_size - 2) * scale)
-            body_height = int((self.tile_size - 2) * scale)
-            top = gy - body_height // 2
-            left = gx - body_width // 2
-
-            # main body (rounded rectangle for smooth top)
-            pygame.draw.rect(screen, c, (left, top + body_height//4, body_width, 3*body_height//4))
-            pygame.draw.circle(screen, c, (gx, top + body_height//4), body_width//2)
-
-    # wavy bottom
-            wave_radius = body_width // 6
-            for i in range(3):
-                wave_x = left + wave_radius * (1 + 2*i)
-                wave_y = top + body_height
-                pygame.draw.circle(screen, c, (wave_x, wave_y), wave_radius)
-
-    # ghost eyes
-            eye_offset_x = body_width // 6
-            eye_offset_y = body_height // 6
-            pygame.draw.circle(screen, (255,255,255), (gx - eye_offset_x, gy - eye_offset_y), 2)  # smaller eyes
-            pygame.draw.circle(screen, (255,255,255), (gx + eye_offset_x, gy - eye_offset_y), 2)
-
-    # pupils
-            pygame.draw.circle(screen, (0,0,0), (gx - eye_offset_x, gy - eye_offset_y), 1)
-            pygame.draw.circle(screen, (0,0,0), (gx + eye_offset_x, gy - eye_offset_y), 1)
-
-        # HUD
+            screen.blit(atlas.ghost(c), (gx - atlas.offset, gy - atlas.offset))
+            dirty.append(self._entity_rect(gx, gy))
+
+        # HUD (only when its text changed)
+        hud_key = (self.engine.pacman.score, self.engine.current_level_name,
+                   self.engine.get_current_highscore())
+        if hud_key != self._hud_key:
+            self._hud_key = hud_key
+            dirty.append(self._draw_hud(screen))
+
+        # next frame erases what was drawn over the background this frame
+        erased = self._prev_rects
+        self._prev_rects = [r for r in dirty if r.top < self.engine.height_px]
+        if self._full_redraw:
+            self._full_redraw = False
+            return [screen.get_rect()]
+        return dirty + erased
+
+    def invalidate(self):
+        """Force a full repaint on the next render (e.g. window was exposed)"""
+        self._full_redraw = True
+        self._gameover_shown = None
+
+    # ----------------------------------------------------------
+    # Game over overlay
+    # ----------------------------------------------------------
+    def _render_game_over(self, screen):
+        """Show the game-over overlay; nothing is redrawn while it is unchanged"""
+        engine = self.engine
+        key = (
+            getattr(engine, 'all_levels_complete', False), engine.win,
+            engine.current_level_name, engine.pacman.score,
+            engine.get_current_highscore(), self.width, self.height,
+        )
+        if key != self._gameover_key:
+            self._gameover_key = key
+            self._gameover_surface = self._build_game_over()
+        elif self._gameover_shown is screen:
+            return []
+
+        screen.fill(BLACK)
+        screen.blit(self._gameover_surface, self._gameover_pos)
+        self._gameover_shown = screen
+        self._full_redraw = True
+        return [screen.get_rect()]
+
+    def _build_game_over(self):
+        # Dynamically size Game Over screen (90% of current window)
+        GAMEOVER_WIDTH = int(self.width * 0.9)
+        GAMEOVER_HEIGHT = int(self.height * 0.9)
+
+        # Create surface
+        gameover_screen = pygame.Surface((GAMEOVER_WIDTH, GAMEOVER_HEIGHT))
+        gameover_screen.fill(BLACK)
+
+        # Base for scaling fonts
+        base = min(GAMEOVER_WIDTH, GAMEOVER_HEIGHT)
+        msg_font = get_font(max(20, base // 16), bold=True)
+        score_font = get_font(max(16, base // 22))
+        level_font = get_font(max(14, base // 28))
+        hint_font = get_font(max(12, base // 38))
+
+        # Check message
+        if getattr(self.engine, 'all_levels_complete', False):
+            msg = "ALL LEVELS COMPLETE!"
+            msg_color = (255, 215, 0)
+        else:
+            msg = "LEVEL COMPLETE!" if self.engine.win else "GAME OVER"
+            msg_color = (0, 255, 0) if self.engine.win else (255, 50, 50)
+
+        # Render text
+        surf = msg_font.render(msg, True, msg_color)
+        level_display = self.engine.current_level_name.upper()
+        level_surf = level_font.render(f"Level: {level_display}", True, (200, 200, 200))
+        score_surf = score_font.render(f"Score: {self.engine.pacman.score}", True, WHITE)
+        highscore_surf = level_font.render(f"High Score: {self.engine.get_current_highscore()}", True, (255, 215, 0))
+
+        # Hint
+        if self.engine.win and not getattr(self.engine, 'all_levels_complete', False):
+            hint_surf = hint_font.render("Press ENTER for next level | SPACE to restart", True, (200, 200, 50))
+        else:
+            hint_surf = hint_font.render("Press SPACE to restart", True, (200, 200, 50))
+
+        # Proportional y-spacing
+        y_pos = GAMEOVER_HEIGHT * 0.1
+        spacing = GAMEOVER_HEIGHT * 0.12
+
+        for surf_item in [surf, level_surf, score_surf, highscore_surf, hint_surf]:
+            gameover_screen.blit(surf_item, (GAMEOVER_WIDTH//2 - surf_item.get_width()//2, int(y_pos)))
+            y_pos += spacing
+
+        # Centered in the window
+        self._gameover_pos = ((self.width - GAMEOVER_WIDTH) // 2, (self.height - GAMEOVER_HEIGHT) // 2)
+        return gameover_screen
+
+    # ----------------------------------------------------------
+    # Static layers
+    # ----------------------------------------------------------
+    def _build_wall_layer(self, maze):
+        """Rasterize the walls (over a black floor) once per layout"""
+        ts = self.tile_size
+        layer = pygame.Surface((maze.width * ts, maze.height * ts))
+        layer.fill(BLACK)
+        for y in range(maze.height):
+            for x in range(maze.width):
+                if maze.is_wall(x,y):
+                    left = x * ts
+                    top = y * ts
+                    pygame.draw.rect(layer, WALL_COLOR, Rect(left, top, ts, ts))
+                    # Top highlight
+                    pygame.draw.line(layer, (100,100,200), (left, top), (left+ts, top), 2)
+                    # Left shadow
+                    pygame.draw.line(layer, (10,10,50), (left, top), (left, top+ts), 2)
+        return layer
+
+    def _rebuild_background(self):
+        """Walls + regular pellets; entities and power pellets go on top each frame"""
+        engine = self.engine
+        self.tile_size = engine.tile_size
+        self.width = engine.width_px
+        self.height = engine.height_px + self.hud_height
+        maze = engine.maze
+        key = (layout_key(maze), self.tile_size)
+        if key != self._wall_key:
+            self._wall_layer = self._build_wall_layer(maze)
+            self._wall_key = key
+        self._maze = maze
+
+        self._background = self._wall_layer.copy()
+        grid = np.zeros((maze.width, maze.height), dtype=bool)
+        if engine.pellets:
+            xs, ys = np.array(list(engine.pellets)).T
+            grid[xs, ys] = True
+        self._stamp_pellets(self._background, grid)
+        self._pellet_grid = grid
+        self._pellets = engine.pellets
+        self._drawn_pellets = set(engine.pellets)
+
+    def _draw_pellet(self, surface, x, y):
+        ts = self.tile_size
+        center = (x * ts + ts//2, y * ts + ts//2)
+        radius = max(2, ts//8)
+        pygame.draw.circle(surface, PELLET_COLOR, center, radius)
+        # Glow effect
+        pygame.draw.circle(surface, (255, 255, 100), center, radius//2)
+
+    def _pellet_stamp(self):
+        """Pixel offsets and colors of one pellet within its tile, drawn once per tile size"""
+        if self._stamp is None or self._stamp[0] != self.tile_size:
+            ts = self.tile_size
+            sprite = pygame.Surface((ts, ts), pygame.SRCALPHA)
+            sprite.fill((0, 0, 0, 0))
+            self._draw_pellet(sprite, 0, 0)
+            mx, my = np.nonzero(pygame.surfarray.array_alpha(sprite))
+            colors = pygame.surfarray.array3d(sprite)[mx, my]
+            self._stamp = (ts, mx, my, colors)
+        return self._stamp[1:]
+
+    def _stamp_pellets(self, surface, grid):
+        """Draw a pellet on every True tile of `grid` (width x height) in one array op"""
+        tx, ty = np.nonzero(grid)
+        if not len(tx):
+            return
+        ts = self.tile_size
+        mx, my, colors = self._pellet_stamp()
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[(tx[:, None] * ts + mx).ravel(),
+               (ty[:, None] * ts + my).ravel()] = np.tile(colors, (len(tx), 1))
+        del pixels   # unlock the surface
+
+    def _sync_pellets(self):
+        """Clear eaten pellets from the background; queue their tiles as dirty"""
+        pellets = self.engine.pellets
+        if pellets is self._pellets and len(pellets) == len(self._drawn_pellets):
+            return
+        if pellets is not self._pellets or len(pellets) > len(self._drawn_pellets):
+            # a different pellet set (reset / restore): repaint the layer
+            self._rebuild_background()
+            self._prev_rects.append(Rect(0, 0, self.engine.width_px, self.engine.height_px))
+            return
+
+        # only the tiles eaten since the last frame are touched
+        ts = self.tile_size
+        eaten = self._drawn_pellets - pellets
+        self._drawn_pellets -= eaten
+        for x, y in eaten:
+            self._pellet_grid[x, y] = False
+            rect = Rect(x * ts, y * ts, ts, ts)
+            self._background.blit(self._wall_layer, rect, rect)
+            self._prev_rects.append(rect)
+
+    # ----------------------------------------------------------
+    # Interpolation
+    # ----------------------------------------------------------
+    def store_positions(self):
+        """Remember entity positions and move timers; call right before a simulation tick"""
+        self._track_moves()
+        self._prev_positions = [(e.x, e.y, e.time_since_move)
+                                for e in [self.engine.pacman] + self.engine.ghosts]
+
+    def _track_moves(self):
+        """
+        Entities whose move timer restarted on the last tick start a slide
+        from where they were before it (their own tile if they were blocked)
+        """
+        entities = [self.engine.pacman] + self.engine.ghosts
+        move_from = self._move_from
+        del move_from[len(entities):]
+        while len(move_from) < len(entities):
+            move_from.append(None)
+        for i, (e, prev) in enumerate(zip(entities, self._prev_positions)):
+            x, y, waited = prev
+            if e.time_since_move < waited or (e.x, e.y) != (x, y):
+                move_from[i] = (x, y)
+
+    def _draw_pos(self, i, entity, alpha):
+        """
+        Pixel position between the entity's previous and current tile:
+        the slide started on its last move and takes one move delay, so it
+        is time_since_move (plus alpha of the running tick) into it
+        """
+        x, y = entity.x, entity.y
+        start = self._move_from[i] if i < len(self._move_from) else None
+        if start is not None and start[0] is not None and entity.move_delay > 0:
+            ox, oy = start
+            # no sliding across teleports (respawn, reset)
+            if abs(x - ox) + abs(y - oy) <= self.tile_size:
+                t = (entity.time_since_move + alpha * self.engine.fixed_dt) / entity.move_delay
+                t = min(t, 1.0)
+                x = ox + (x - ox) * t
+                y = oy + (y - oy) * t
+        return int(x), int(y)
+
+    def _atlas(self):
+        """Entity sprites for the current tile size"""
+        if self._sprites is None or self._sprites.tile_size != self.tile_size:
+            self._sprites = get_sprite_atlas(self.tile_size)
+        return self._sprites
+
+    def _entity_rect(self, x, y):
+        """Screen area an entity centred at (x, y) may touch"""
+        ts = self.tile_size
+        return Rect(x - ts//2 - 2, y - ts//2 - 2, ts + 4, ts + 4)
+
+    def _text(self, font, string, color):
+        """Rendered text surface, from a bounded LRU cache"""
+        key = (font, string, color)
+        cache = self._text_cache
+        surf = cache.get(key)
+        if surf is not None:
+            cache.move_to_end(key)
+            return surf
+        surf = cache[key] = font.render(string, True, color)
+        if len(cache) > TEXT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return surf
+
+    def _draw_hud(self, screen):
         hud_bg = Rect(0, self.engine.height_px, self.width, self.hud_height)
         pygame.draw.rect(screen, (20,20,20), hud_bg)
 
@@ -274,13 +430,14 @@ class Renderer:
         # Optional high score display
         if hasattr(self.engine, "high_scores") and self.engine.high_scores:
             hs_text = f"High Score: {max(self.engine.high_scores)}"
-            screen.blit(self.font.render(hs_text, True, (255,215,0)), (400, self.engine.height_px + 8))
+            screen.blit(self._text(self.font, hs_text, (255,215,0)), (400, self.engine.height_px + 8))
 
         # Draw HUD
-        score_text = self.font.render(f"Score: {self.engine.pacman.score}", True, WHITE)
-        level_text = self.font.render(f"Level: {self.engine.current_level_name.upper()}", True, (100,200,255))
-        high_text = self.font.render(f"High: {self.engine.get_current_highscore()}", True, (255,215,0))
+        score_text = self._text(self.font, f"Score: {self.engine.pacman.score}", WHITE)
+        level_text = self._text(self.font, f"Level: {self.engine.current_level_name.upper()}", (100,200,255))
+        high_text = self._text(self.font, f"High: {self.engine.get_current_highscore()}", (255,215,0))
 
         screen.blit(score_text, (10, self.engine.height_px + 10))
         screen.blit(level_text, (self.width//2 - level_text.get_width()//2, self.engine.height_px + 10))
         screen.blit(high_text, (self.width - high_text.get_width() - 10, self.engine.height_px + 10))
+        return hud_bg
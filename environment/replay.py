@@ -0,0 +1,83 @@
+# environment/replay.py
+# Recorded action logs: play an episode headless once, re-simulate it later
+
+import json
+
+from .game_engine import GameEngine
+
+
+# One character per tick keeps an hour of play (~108k ticks) around 100 KB
+ACTION_CODES = {(1, 0): "R", (-1, 0): "L", (0, 1): "D", (0, -1): "U", (0, 0): "."}
+CODE_ACTIONS = {c: a for a, c in ACTION_CODES.items()}
+
+
+class ActionLog:
+    """
+    Everything needed to re-simulate an episode tick for tick: the engine's
+    seed and level, plus Pac-Man's move for every tick. Ghosts draw only from
+    the world RNG, so feeding the same moves back through step(action)
+    reproduces the game without running the controller again.
+    """
+
+    def __init__(self, level_name, variation, seed, actions=None, final_score=None):
+        self.level_name = level_name
+        self.variation = variation
+        self.seed = seed
+        self.actions = list(actions or [])
+        self.final_score = final_score
+
+    def __len__(self):
+        return len(self.actions)
+
+    def make_engine(self):
+        """Fresh headless engine at tick 0 of the recorded episode"""
+        return GameEngine(level_name=self.level_name, variation=self.variation,
+                          headless=True, seed=self.seed)
+
+    def replay(self, engine=None):
+        """Step `engine` (default: a new one) through the log, yielding it after each tick"""
+        if engine is None:
+            engine = self.make_engine()
+        for action in self.actions:
+            engine.step(action)
+            yield engine
+
+    # ----------------------------------------------------------
+    def to_dict(self):
+        return {
+            "level": self.level_name,
+            "variation": self.variation,
+            "seed": self.seed,
+            "final_score": self.final_score,
+            "actions": "".join(ACTION_CODES[a] for a in self.actions),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["level"], data["variation"], data["seed"],
+                   [CODE_ACTIONS[c] for c in data["actions"]], data.get("final_score"))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def record_episode(level_name, variation=0, seed=0, controller="hybrid", max_steps=5000):
+    """Play one headless autopilot episode and return its ActionLog"""
+    engine = GameEngine(level_name=level_name, variation=variation, headless=True,
+                        seed=seed, controller=controller)
+    log = ActionLog(level_name, engine.current_variation, seed)
+
+    done = False
+    while not done and engine.steps < max_steps:
+        _, done, _ = engine.step()
+        # the move the autopilot committed to this tick
+        log.actions.append(tuple(engine.pacman.direction))
+
+    log.final_score = engine.pacman.score
+    return log
@@ -0,0 +1,142 @@
+# environment/sprite_atlas.py
+# Pre-rendered Pac-Man and ghost frames, one atlas per tile size
+
+import math
+
+import pygame
+
+BLACK = (0,0,0)
+PACMAN_COLOR = (255, 220, 0)
+
+# Pac-Man facings, (0, 0) = standing still
+PACMAN_DIRECTIONS = [(1, 0), (-1, 0), (0, -1), (0, 1), (0, 0)]
+
+
+class SpriteAtlas:
+    """
+    Every entity frame drawn once onto a transparent Surface, so drawing an
+    entity is a single blit. Frames are (tile_size + 4) px squares centred
+    on the entity; blit them at `pos - offset`.
+    """
+
+    def __init__(self, tile_size):
+        self.tile_size = tile_size
+        self.size = tile_size + 4
+        self.offset = self.size // 2
+
+        self.pacman_frames = {}
+        for direction in PACMAN_DIRECTIONS:
+            for mouth_open in (True, False):
+                self.pacman_frames[(direction, mouth_open)] = \
+                    self._draw_pacman(direction, mouth_open)
+        self.ghost_frames = {}   # color -> Surface, filled on first use
+
+    def pacman(self, direction, mouth_open):
+        frame = self.pacman_frames.get((direction, mouth_open))
+        if frame is None:
+            frame = self.pacman_frames[((0, 0), mouth_open)]
+        return frame
+
+    def ghost(self, color):
+        frame = self.ghost_frames.get(color)
+        if frame is None:
+            frame = self.ghost_frames[color] = self._draw_ghost(color)
+        return frame
+
+    # ----------------------------------------------------------
+    def _surface(self):
+        surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        return surface
+
+    def _draw_pacman(self, direction, mouth_open):
+        surface = self._surface()
+        px = py = self.offset
+        radius = self.tile_size//2 - 2
+        angle = 40 if mouth_open else 10
+
+        # direction → angle mapping
+        dx, dy = direction
+        if (dx, dy) == (1, 0):     # RIGHT
+            start, end = math.radians(angle), math.radians(360 - angle)
+            arc = (-angle, angle)
+        elif (dx, dy) == (-1, 0):  # LEFT
+            start, end = math.radians(180 + angle), math.radians(180 - angle)
+            arc = (180 - angle, 180 + angle)
+        elif (dx, dy) == (0, -1):  # UP
+            start, end = math.radians(90 + angle), math.radians(90 - angle)
+            arc = (90 - angle, 90 + angle)
+        elif (dx, dy) == (0, 1):   # DOWN
+            start, end = math.radians(270 + angle), math.radians(270 - angle)
+            arc = (270 - angle, 270 + angle)
+        else:
+            # standing still → minimal mouth
+            start, end = math.radians(5), math.radians(355)
+            arc = (-angle, angle)
+
+        # Body
+        pygame.draw.circle(surface, PACMAN_COLOR, (px, py), radius)
+
+        # Highlight for 3D effect
+        highlight_pos = (px - radius//3, py - radius//3)
+        pygame.draw.circle(surface, (255,255,150), highlight_pos, radius//3)
+
+        # Draw mouth using arc for smooth cut
+        if mouth_open:
+            mouth_rect = pygame.Rect(px - radius, py - radius, 2*radius, 2*radius)
+            pygame.draw.arc(surface, BLACK, mouth_rect,
+                            math.radians(arc[0]), math.radians(arc[1]), radius//2)
+
+        # Mouth cutout (triangle wedge)
+        mouth_points = [
+            (px, py),
+            (px + radius * math.cos(start), py - radius * math.sin(start)),
+            (px + radius * math.cos(end),   py - radius * math.sin(end)),
+        ]
+        pygame.draw.polygon(surface, BLACK, mouth_points)
+        return surface
+
+    def _draw_ghost(self, c):
+        surface = self._surface()
+        gx = gy = self.offset
+
+        # scale factor (70% of tile size)
+        scale = 0.7
+        body_width = int((self.tile_size - 2) * scale)
+        body_height = int((self.tile_size - 2) * scale)
+        top = gy - body_height // 2
+        left = gx - body_width // 2
+
+        # main body (rounded rectangle for smooth top)
+        pygame.draw.rect(surface, c, (left, top + body_height//4, body_width, 3*body_height//4))
+        pygame.draw.circle(surface, c, (gx, top + body_height//4), body_width//2)
+
+        # wavy bottom
+        wave_radius = body_width // 6
+        for i in range(3):
+            wave_x = left + wave_radius * (1 + 2*i)
+            wave_y = top + body_height
+            pygame.draw.circle(surface, c, (wave_x, wave_y), wave_radius)
+
+        # ghost eyes
+        eye_offset_x = body_width // 6
+        eye_offset_y = body_height // 6
+        pygame.draw.circle(surface, (255,255,255), (gx - eye_offset_x, gy - eye_offset_y), 2)
+        pygame.draw.circle(surface, (255,255,255), (gx + eye_offset_x, gy - eye_offset_y), 2)
+
+        # pupils
+        pygame.draw.circle(surface, (0,0,0), (gx - eye_offset_x, gy - eye_offset_y), 1)
+        pygame.draw.circle(surface, (0,0,0), (gx + eye_offset_x, gy - eye_offset_y), 1)
+        return surface
+
+
+# ----------------------------------------------------------
+_ATLASES = {}
+
+
+def get_sprite_atlas(tile_size):
+    """Shared atlas for a tile size (built on first request)"""
+    atlas = _ATLASES.get(tile_size)
+    if atlas is None:
+        atlas = _ATLASES[tile_size] = SpriteAtlas(tile_size)
+    return atlas
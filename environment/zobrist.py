@@ -0,0 +1,76 @@
+# environment/zobrist.py
+# Zobrist hashing of the board: pellets, Pac-Man tile, ghost tiles + states
+
+from collections import OrderedDict
+
+from utils.rng import SplitMixRandom
+
+
+# Tables only depend on the grid size, so every layout of that size shares one
+MAX_CACHED_TABLES = 32
+_TABLE_CACHE = OrderedDict()
+
+
+def get_zobrist_table(width, height):
+    """Return the cached ZobristTable for a width x height grid"""
+    key = (width, height)
+    table = _TABLE_CACHE.get(key)
+    if table is None:
+        table = ZobristTable(width, height)
+        _TABLE_CACHE[key] = table
+        if len(_TABLE_CACHE) > MAX_CACHED_TABLES:
+            _TABLE_CACHE.popitem(last=False)
+    else:
+        _TABLE_CACHE.move_to_end(key)
+    return table
+
+
+class ZobristTable:
+    """
+    One random 64-bit key per (feature, tile). A board's hash is the XOR of
+    the keys of everything on it, so the engine keeps it up to date by
+    XOR-ing keys out and in as pellets are eaten and entities move or change
+    state, and never rehashes the whole board.
+
+    Keys are seeded from the grid size: the same board hashes the same in
+    every process.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._prefix = f"zobrist:{width}x{height}"
+        self.pellet = self._keys("pellet")
+        self.power = self._keys("power")
+        self.pacman = self._keys("pacman")
+        self._ghosts = {}    # (ghost index, state) -> keys, built on first use
+
+    def _keys(self, name):
+        rng = SplitMixRandom(f"{self._prefix}:{name}")
+        return [rng.getrandbits(64) for _ in range(self.width * self.height)]
+
+    # ----------------------------------------------------------
+    def ghost(self, index, state):
+        """Per-tile keys of ghost `index` while in `state` ("normal" / "vulnerable")"""
+        keys = self._ghosts.get((index, state))
+        if keys is None:
+            keys = self._ghosts[(index, state)] = self._keys(f"ghost{index}:{state}")
+        return keys
+
+    def ghost_key(self, index, ghost):
+        return self.ghost(index, ghost.state)[ghost.ty * self.width + ghost.tx]
+
+    def pacman_key(self, pacman):
+        return self.pacman[pacman.ty * self.width + pacman.tx]
+
+    def board_hash(self, engine):
+        """Hash of an engine's board from scratch (the engine maintains it incrementally)"""
+        w = self.width
+        h = self.pacman_key(engine.pacman)
+        for x, y in engine.pellets:
+            h ^= self.pellet[y * w + x]
+        for x, y in engine.power_pellets:
+            h ^= self.power[y * w + x]
+        for i, g in enumerate(engine.ghosts):
+            h ^= self.ghost_key(i, g)
+        return h
@@ -0,0 +1,184 @@
+# evaluate.py
+# Multi-core autopilot evaluation over every level / variation
+
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from environment.game_engine import GameEngine, CONTROLLERS
+from ai_modules.mcts_controller import MCTSController
+from environment.levels import LEVELS, LEVEL_ORDER
+
+
+MAX_STEPS = 5000   # ~2.8 min of game time at 30 ticks/s
+
+
+# ----------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------
+def episode_seed(base_seed, level_name, variation, episode):
+    """Deterministic per-episode seed, independent of worker scheduling"""
+    return f"{base_seed}:{level_name}:{variation}:{episode}"
+
+
+def run_episode(task):
+    """
+    Play one headless autopilot episode.
+    task: (level_name, variation, episode, base_seed, max_steps, controller)
+    """
+    level_name, variation, episode, base_seed, max_steps, controller = task
+
+    seed = episode_seed(base_seed, level_name, variation, episode)
+    engine = GameEngine(level_name=level_name, variation=variation, headless=True,
+                        seed=seed, controller=controller)
+    if isinstance(engine.controller, MCTSController):
+        # rollout budget only: a wall-clock limit would tie results to machine load
+        engine.controller.time_limit = None
+
+    start = time.perf_counter()
+    done = False
+    while not done and engine.steps < max_steps:
+        _, done, info = engine.step()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "level": level_name,
+        "variation": variation,
+        "episode": episode,
+        "score": info["score"],
+        "win": info["win"],
+        "timeout": not done,
+        "steps": info["steps"],
+        "seconds": elapsed,
+    }
+
+
+def make_tasks(episodes, levels=None, base_seed=0, max_steps=MAX_STEPS,
+               controller="hybrid"):
+    """One task per (level, variation, episode)"""
+    levels = levels or LEVEL_ORDER
+    return [
+        (level_name, variation, episode, base_seed, max_steps, controller)
+        for level_name in levels
+        for variation in range(len(LEVELS[level_name]))
+        for episode in range(episodes)
+    ]
+
+
+def stream_results(tasks, workers=None, chunksize=None):
+    """Yield episode results as soon as workers finish them"""
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for task in tasks:
+            yield run_episode(task)
+        return
+
+    # Large chunks keep IPC negligible next to simulation time
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 8))
+
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(run_episode, tasks, chunksize=chunksize)
+
+
+# ----------------------------------------------------------
+# Aggregation
+# ----------------------------------------------------------
+def summarize(results):
+    """Win rate, score distribution and steps/sec for a list of results"""
+    scores = np.array([r["score"] for r in results])
+    steps = sum(r["steps"] for r in results)
+    seconds = sum(r["seconds"] for r in results)
+
+    p10, p25, p50, p75, p90 = np.percentile(scores, [10, 25, 50, 75, 90])
+    return {
+        "episodes": len(results),
+        "win_rate": sum(r["win"] for r in results) / len(results),
+        "timeout_rate": sum(r["timeout"] for r in results) / len(results),
+        "score_mean": float(scores.mean()),
+        "score_std": float(scores.std()),
+        "score_min": int(scores.min()),
+        "score_p10": float(p10),
+        "score_p25": float(p25),
+        "score_median": float(p50),
+        "score_p75": float(p75),
+        "score_p90": float(p90),
+        "score_max": int(scores.max()),
+        "mean_steps": steps / len(results),
+        "steps_per_sec": steps / seconds if seconds else 0.0,  # per core
+    }
+
+
+def evaluate(episodes, levels=None, base_seed=0, workers=None,
+             max_steps=MAX_STEPS, progress=None, controller="hybrid"):
+    """
+    Run `episodes` seeds for every level/variation across a process pool.
+    progress: optional callback(done_count, total, result) for streaming output.
+    """
+    tasks = make_tasks(episodes, levels, base_seed, max_steps, controller)
+    by_level = {}
+    by_variation = {}
+
+    start = time.perf_counter()
+    for i, result in enumerate(stream_results(tasks, workers), 1):
+        by_level.setdefault(result["level"], []).append(result)
+        key = f'{result["level"]}/{result["variation"]}'
+        by_variation.setdefault(key, []).append(result)
+        if progress:
+            progress(i, len(tasks), result)
+    wall = time.perf_counter() - start
+
+    total_steps = sum(r["steps"] for rs in by_level.values() for r in rs)
+    return {
+        "workers": workers or os.cpu_count() or 1,
+        "wall_seconds": wall,
+        "total_steps_per_sec": total_steps / wall if wall else 0.0,
+        "levels": {name: summarize(rs) for name, rs in by_level.items()},
+        "variations": {name: summarize(rs) for name, rs in sorted(by_variation.items())},
+    }
+
+
+# ----------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the autopilot headlessly")
+    parser.add_argument("--episodes", type=int, default=100,
+                        help="seeds per level variation")
+    parser.add_argument("--levels", nargs="+", choices=LEVEL_ORDER, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes (default: all cores)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--controller", choices=sorted(CONTROLLERS), default="hybrid")
+    parser.add_argument("--json", default=None, help="write the full report here")
+    args = parser.parse_args()
+
+    def progress(done, total, result):
+        if done % max(1, total // 20) == 0 or done == total:
+            print(f"  {done}/{total} episodes", flush=True)
+
+    report = evaluate(args.episodes, args.levels, args.seed, args.workers,
+                      args.max_steps, progress, args.controller)
+
+    print(f"\n{report['workers']} workers, {report['wall_seconds']:.1f}s, "
+          f"{report['total_steps_per_sec']:.0f} steps/s total")
+    print(f"{'level':<14}{'win%':>7}{'mean':>9}{'p10':>8}{'median':>8}{'p90':>8}{'steps/s':>10}")
+    for name in LEVEL_ORDER:
+        if name not in report["levels"]:
+            continue
+        s = report["levels"][name]
+        print(f"{name:<14}{100 * s['win_rate']:>6.1f}%{s['score_mean']:>9.1f}"
+              f"{s['score_p10']:>8.0f}{s['score_median']:>8.0f}{s['score_p90']:>8.0f}"
+              f"{s['steps_per_sec']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# export_video.py
+# Render autopilot episodes offscreen (no display) to frames or a video pipe
+#
+#   python export_video.py --level pro --seed 7 --save-log run.json --format png --out frames/
+#   python export_video.py --log run.json --every 2 --format raw --out - | \
+#       ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r 15 -i - run.mp4   # size is printed
+#   python export_video.py --log run.json --format pipe \
+#       --out "ffmpeg -y -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps} -i - run.mp4"
+
+import argparse
+import sys
+import time
+
+from environment.frame_export import open_sink, export_episode, frame_size
+from environment.game_engine import CONTROLLERS, FIXED_DT
+from environment.levels import LEVEL_ORDER
+from environment.replay import ActionLog, record_episode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offscreen episode export")
+    parser.add_argument("--log", default=None, help="replay this action log instead of playing")
+    parser.add_argument("--level", default=LEVEL_ORDER[0], choices=LEVEL_ORDER)
+    parser.add_argument("--variation", type=int, default=0)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--controller", default="hybrid", choices=sorted(CONTROLLERS))
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--save-log", default=None, help="write the played episode's action log here")
+    parser.add_argument("--format", default="png", choices=["png", "raw", "pipe"])
+    parser.add_argument("--out", default="frames",
+                        help="png: directory, raw: file or '-', pipe: command")
+    parser.add_argument("--every", type=int, default=1, help="keep one frame per N ticks")
+    parser.add_argument("--batch", type=int, default=64, help="frames per sink write")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.log:
+        log = ActionLog.load(args.log)
+    else:
+        log = record_episode(args.level, args.variation, args.seed,
+                             args.controller, args.max_steps)
+        if args.save_log:
+            log.save(args.save_log)
+
+    size = frame_size(log.make_engine())
+    fps = 1.0 / FIXED_DT / args.every
+    sink = open_sink(args.format, args.out, size, f"{fps:g}")
+
+    start = time.perf_counter()
+    try:
+        frames = export_episode(log, sink, every=args.every, batch_size=args.batch,
+                                max_frames=args.max_frames)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - start
+
+    # stdout may carry the frames themselves
+    print(f"{frames} frames {size[0]}x{size[1]} @ {fps:g} fps "
+          f"({len(log) * FIXED_DT:.1f}s of game) in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,130 @@
 # main.py
 import sys
 import pygame
-from environment.game_engine import GameEngine
+from environment.game_engine import GameEngine, FIXED_DT
 from environment.renderer import Renderer
 
-import sys
 import os
 sys.path.append(os.path.abspath("."))  # Adds current folder to module search path
 
 
-FPS = 30
+FPS = 60                   # display cap; the simulation always ticks at 1 / FIXED_DT
+MAX_TICKS_PER_FRAME = 5    # catch-up ticks per frame when behind
+MAX_BACKLOG = 0.25         # seconds of lag kept after a stall; older time is dropped
+# A frame simulates at most MAX_TICKS_PER_FRAME * FIXED_DT (1/6 s), so below
+# ~6 FPS the game runs in slow motion instead of jumping ahead; MAX_BACKLOG
+# only bounds the catch-up burst after a single long stall (window drag,
+# breakpoint) and sits above that per-frame cap so it never binds first.
+MAX_FRAME_SKIP = 3         # consecutive frames that may go undrawn under load
+IDLE_TIMEOUT_MS = 1000     # longest block on the event queue in idle states
 WINDOW_TITLE = "Pac-Man Hybrid (Environment + UI) - Prototype"
 
-def main():
-    pygame.init()
-    clock = pygame.time.Clock()
-    engine = GameEngine()
-    renderer = Renderer(engine)
-    
-    # Initial screen creation
-    screen = pygame.display.set_mode((renderer.width, renderer.height))
-    pygame.display.set_caption(WINDOW_TITLE)
+# Main loop states
+PLAYING = "playing"
+GAME_OVER = "game_over"
+LEVEL_TRANSITION = "level_transition"
+QUIT = "quit"
+
 
-    running = True
-    while running:
-        dt = clock.tick(FPS) / 1000.0  # dt seconds
+# ----------------------------------------------------------
+# State handlers (each returns the next state)
+# ----------------------------------------------------------
+def run_playing(game):
+    """One display frame: events, fixed simulation ticks, render"""
+    engine, renderer = game["engine"], game["renderer"]
+    game["accumulator"] = min(game["accumulator"] + game["clock"].tick(FPS) / 1000.0,
+                              MAX_BACKLOG)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                else:
-                    engine.handle_keydown(event.key)
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            return QUIT
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                return QUIT
+            engine.handle_keydown(event.key)
 
-        # Update game
+    # Update game in fixed ticks, independent of the display rate
+    ticks = 0
+    while game["accumulator"] >= FIXED_DT and ticks < MAX_TICKS_PER_FRAME:
         if engine.running:
-            engine.update(dt)
-
-        renderer.render(screen)
-        pygame.display.flip()
-
-        # If game over → wait for user input
-        if getattr(engine, "game_over", False):
-            waiting = True
-            while waiting:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                        waiting = False
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_SPACE:
-                            engine.reset_to_level()  # Restart current level
-                            
-                            # ADDED: Resize window after reset
-                            renderer = Renderer(engine)
-                            screen = pygame.display.set_mode((renderer.width, renderer.height))
-                            
-                            waiting = False
-                        elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                            if engine.win:
-                                if not engine.load_next_level():
-                                    # All levels complete
-                                    engine.reset_to_level(0)
-                                
-                                # ADDED: Resize window for next level
-                                renderer = Renderer(engine)
-                                screen = pygame.display.set_mode((renderer.width, renderer.height))
-                                
-                                waiting = False
-                        elif event.key == pygame.K_ESCAPE:
-                            running = False
-                            waiting = False
-                
-                # Keep rendering during wait
-                renderer.render(screen)
-                pygame.display.flip()
+            renderer.store_positions()
+            engine.update(FIXED_DT)
+        game["accumulator"] -= FIXED_DT
+        ticks += 1
+
+    # Still behind after catching up: skip drawing this frame
+    if game["accumulator"] >= FIXED_DT and game["skipped"] < MAX_FRAME_SKIP:
+        game["skipped"] += 1
+    else:
+        game["skipped"] = 0
+        # only push the regions that changed this frame
+        alpha = min(game["accumulator"] / FIXED_DT, 1.0)
+        pygame.display.update(renderer.render(game["screen"], alpha))
+
+    return GAME_OVER if engine.game_over else PLAYING
+
+
+def run_game_over(game):
+    """
+    Static overlay: draw it once, then sleep on the event queue instead of
+    polling; the renderer reports nothing to update while it's unchanged.
+    """
+    engine, renderer = game["engine"], game["renderer"]
+    pygame.display.update(renderer.render(game["screen"]))
+
+    event = pygame.event.wait(IDLE_TIMEOUT_MS)
+    if event.type == pygame.QUIT:
+        return QUIT
+    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+        renderer.invalidate()
+    elif event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_ESCAPE:
+            return QUIT
+        if event.key == pygame.K_SPACE:
+            engine.reset_to_level()  # Restart current level
+            return LEVEL_TRANSITION
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER) and engine.win:
+            if not engine.load_next_level():
+                # All levels complete
+                engine.reset_to_level(0)
+            return LEVEL_TRANSITION
+    return GAME_OVER
+
+
+def run_level_transition(game):
+    """New (or restarted) level: fit the window to the maze and restart the clock"""
+    game["renderer"] = Renderer(game["engine"])
+    game["screen"] = pygame.display.set_mode((game["renderer"].width, game["renderer"].height))
+    # don't replay the time spent on the game-over screen
+    game["clock"].tick()
+    game["accumulator"] = 0.0
+    game["skipped"] = 0
+    return PLAYING
+
+
+STATE_HANDLERS = {
+    PLAYING: run_playing,
+    GAME_OVER: run_game_over,
+    LEVEL_TRANSITION: run_level_transition,
+}
+
+
+def main():
+    pygame.init()
+    game = {
+        "engine": GameEngine(),
+        "renderer": None,
+        "screen": None,
+        "clock": pygame.time.Clock(),
+        "accumulator": 0.0,
+        "skipped": 0,
+    }
+    pygame.display.set_caption(WINDOW_TITLE)
+
+    # First transition creates the window for the starting level
+    state = LEVEL_TRANSITION
+    while state != QUIT:
+        state = STATE_HANDLERS[state](game)
 
     pygame.quit()
 
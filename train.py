@@ -0,0 +1,230 @@
+# train.py
+# Approximate Q-learning over every level, with parallel experience collection
+#
+#   python train.py --iterations 30 --episodes 8 --workers 8
+#   python evaluate.py --controller qlearn --episodes 50    # plays checkpoints/qlearning.npz
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from ai_modules.feature_extractor import FeatureExtractor, NUM_FEATURES
+from ai_modules.forward_model import DIRECTIONS
+from ai_modules.q_learning import ApproximateQAgent, DEFAULT_CHECKPOINT, is_decision_tick
+from environment.game_engine import GameEngine
+from environment.levels import LEVELS, LEVEL_ORDER
+from evaluate import episode_seed
+from utils.rng import SplitMixRandom
+
+
+MAX_STEPS = 3000       # ticks per training episode
+LOCKSTEP = 16          # episodes a worker advances together (batched feature extraction)
+
+# Rewards: score gained between decisions, minus a per-decision cost, plus
+# terminal bonuses; all scaled so Q-values stay near the feature range.
+STEP_COST = 1.0
+DEATH_PENALTY = 500.0
+WIN_BONUS = 500.0
+REWARD_SCALE = 0.01
+
+
+# ----------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------
+def collect_experience(task):
+    """
+    Play a group of episodes in lockstep with an epsilon-greedy policy.
+    task: (weights, epsilon, episodes, max_steps) with episodes a list of
+          (level_name, variation, seed)
+    Returns transition arrays (one row per decision) and per-episode stats.
+    """
+    weights, epsilon, episodes, max_steps = task
+    agent = ApproximateQAgent(weights)
+    extractor = FeatureExtractor()
+
+    engines = [GameEngine(level_name=level, variation=variation, headless=True, seed=seed)
+               for level, variation, seed in episodes]
+    rngs = [SplitMixRandom(f"{seed}:explore") for _, _, seed in episodes]
+    moves = [(0, 0)] * len(engines)
+    pending = [None] * len(engines)    # [features, action, reward] of the open decision
+
+    states, actions, rewards, next_states, dones = [], [], [], [], []
+    stats = []
+
+    def close(i, features, reward, done):
+        state, action, acc = pending[i]
+        states.append(state)
+        actions.append(action)
+        rewards.append((acc + reward) * REWARD_SCALE)
+        next_states.append(features)
+        dones.append(done)
+
+    active = list(range(len(engines)))
+    start = time.perf_counter()
+    while active:
+        # Decide for every engine whose Pac-Man moves this tick, in one batch
+        deciding = [i for i in active if is_decision_tick(engines[i])]
+        if deciding:
+            features = extractor.extract_batch([engines[i] for i in deciding])
+            for i, f in zip(deciding, features):
+                if pending[i] is not None:
+                    close(i, f, -STEP_COST, False)
+                action = agent.act(f, epsilon, rngs[i])
+                if action < 0:
+                    pending[i] = None
+                    moves[i] = (0, 0)
+                else:
+                    pending[i] = [f, action, 0.0]
+                    moves[i] = DIRECTIONS[action]
+
+        still = []
+        for i in active:
+            engine = engines[i]
+            reward, done, info = engine.step(moves[i])
+            if pending[i] is not None:
+                pending[i][2] += reward
+            if not done and engine.steps < max_steps:
+                still.append(i)
+                continue
+
+            if pending[i] is not None:
+                final = extractor.extract(engine)
+                if done:
+                    close(i, final, WIN_BONUS if info["win"] else -DEATH_PENALTY, True)
+                else:
+                    # time limit, not a terminal state: keep bootstrapping
+                    close(i, final, -STEP_COST, False)
+            stats.append({"level": info["level"], "score": info["score"],
+                          "win": info["win"], "steps": info["steps"]})
+        active = still
+    elapsed = time.perf_counter() - start
+
+    return {
+        "states": np.array(states, dtype=np.float32).reshape(-1, NUM_FEATURES),
+        "actions": np.array(actions, dtype=np.int64),
+        "rewards": np.array(rewards, dtype=np.float64),
+        "next_states": np.array(next_states, dtype=np.float32).reshape(-1, NUM_FEATURES),
+        "dones": np.array(dones, dtype=bool),
+        "episodes": stats,
+        "seconds": elapsed,
+    }
+
+
+def make_tasks(weights, epsilon, iteration, episodes, levels=None, base_seed=0,
+               max_steps=MAX_STEPS, lockstep=LOCKSTEP):
+    """`episodes` seeds per level variation, grouped into lockstep tasks"""
+    levels = levels or LEVEL_ORDER
+    runs = [
+        (level_name, variation,
+         episode_seed(base_seed, level_name, variation, iteration * episodes + episode))
+        for level_name in levels
+        for variation in range(len(LEVELS[level_name]))
+        for episode in range(episodes)
+    ]
+    return [(weights, epsilon, runs[i:i + lockstep], max_steps)
+            for i in range(0, len(runs), lockstep)]
+
+
+# ----------------------------------------------------------
+# Training loop
+# ----------------------------------------------------------
+def epsilon_at(iteration, iterations, start, end):
+    """Linear exploration decay from start to end over the run"""
+    if iterations <= 1:
+        return end
+    return start + (end - start) * iteration / (iterations - 1)
+
+
+def train(agent, iterations, episodes, levels=None, workers=None, base_seed=0,
+          max_steps=MAX_STEPS, epsilon=(0.3, 0.05), checkpoint=None, progress=None):
+    """
+    Alternate parallel collection with the current weights and a batch
+    update on everything collected. Tasks are seeded and results consumed
+    in order, so a run does not depend on the number of workers.
+    progress: optional callback(iteration, summary dict)
+    """
+    workers = workers or os.cpu_count() or 1
+    update_rng = np.random.default_rng(base_seed)
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for it in range(iterations):
+            eps = epsilon_at(it, iterations, *epsilon)
+            tasks = make_tasks(agent.weights, eps, it, episodes, levels, base_seed, max_steps)
+
+            start = time.perf_counter()
+            results = list(pool.imap(collect_experience, tasks) if pool
+                           else map(collect_experience, tasks))
+            collect = time.perf_counter() - start
+
+            batch = {k: np.concatenate([r[k] for r in results])
+                     for k in ("states", "actions", "rewards", "next_states", "dones")}
+            td = agent.update(batch["states"], batch["actions"], batch["rewards"],
+                              batch["next_states"], batch["dones"], update_rng)
+
+            runs = [e for r in results for e in r["episodes"]]
+            summary = {
+                "epsilon": eps,
+                "episodes": len(runs),
+                "transitions": len(batch["actions"]),
+                "td_error": td,
+                "score_mean": float(np.mean([e["score"] for e in runs])),
+                "win_rate": sum(e["win"] for e in runs) / len(runs),
+                "steps_per_sec": sum(e["steps"] for e in runs) / collect,
+                "seconds": time.perf_counter() - start,
+            }
+            if checkpoint:
+                agent.save(checkpoint, iteration=it + 1, seed=base_seed)
+            if progress:
+                progress(it, summary)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return agent
+
+
+# ----------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Train the approximate Q-learning autopilot")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--episodes", type=int, default=8,
+                        help="seeds per level variation per iteration")
+    parser.add_argument("--levels", nargs="+", choices=LEVEL_ORDER, default=None)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--epsilon", type=float, nargs=2, default=(0.3, 0.05),
+                        metavar=("START", "END"))
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--gamma", type=float, default=0.95)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the weights in --checkpoint")
+    args = parser.parse_args()
+
+    if args.resume and os.path.exists(args.checkpoint):
+        agent = ApproximateQAgent.load(args.checkpoint)
+        agent.alpha, agent.gamma = args.alpha, args.gamma
+    else:
+        agent = ApproximateQAgent(alpha=args.alpha, gamma=args.gamma)
+
+    print(f"{'iter':>4}{'eps':>7}{'episodes':>10}{'decisions':>11}{'td':>8}"
+          f"{'score':>9}{'win%':>7}{'steps/s':>10}{'sec':>7}")
+
+    def progress(it, s):
+        print(f"{it + 1:>4}{s['epsilon']:>7.3f}{s['episodes']:>10}{s['transitions']:>11}"
+              f"{s['td_error']:>8.3f}{s['score_mean']:>9.1f}{100 * s['win_rate']:>6.1f}%"
+              f"{s['steps_per_sec']:>10.0f}{s['seconds']:>7.1f}", flush=True)
+
+    start = time.perf_counter()
+    train(agent, args.iterations, args.episodes, args.levels, args.workers, args.seed,
+          args.max_steps, tuple(args.epsilon), args.checkpoint, progress)
+    print(f"\n{time.perf_counter() - start:.1f}s, weights saved to {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# rng.py
+# Small-state random generator for reproducible, cheaply snapshotted games
+
+import hashlib
+import os
+import random
+
+MASK64 = (1 << 64) - 1
+
+
+class SplitMixRandom(random.Random):
+    """
+    random.Random with a splitmix64 core.
+
+    Its whole state is one 64-bit int, so getstate()/setstate() are O(1);
+    the default Mersenne Twister carries 625 words, which dominates the cost
+    of snapshotting a game for search. choice/shuffle/randint etc. are
+    inherited and built on _randbelow()/getrandbits().
+    """
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        elif not isinstance(a, int):
+            # str / bytes seeds: stable across processes (unlike hash())
+            if isinstance(a, str):
+                a = a.encode()
+            a = int.from_bytes(hashlib.sha256(a).digest()[:8], "little")
+        self._state = a & MASK64
+        self.gauss_next = None
+
+    def getstate(self):
+        return self._state
+
+    def setstate(self, state):
+        self._state = state
+        self.gauss_next = None
+
+    def _next64(self):
+        self._state = z = (self._state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def _randbelow(self, n):
+        # multiply-shift instead of rejection sampling (bias < n / 2**64)
+        return (self._next64() * n) >> 64
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._next64() >> (64 - k)
+        out, bits = 0, 0
+        while bits < k:
+            out = (out << 64) | self._next64()
+            bits += 64
+        return out >> (bits - k)
+
+    def copy(self):
+        other = SplitMixRandom.__new__(SplitMixRandom)
+        other._state = self._state
+        other.gauss_next = None
+        return other